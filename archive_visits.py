@@ -0,0 +1,42 @@
+import argparse
+import sys
+import os
+import traceback
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive visits from closed route cycles (run on a schedule)")
+    parser.add_argument("--territory", default=None, help="Only archive this territory (default: all)")
+    parser.add_argument("--months-ahead", type=int, default=3, help="Monthly visit partitions to keep ready")
+    args = parser.parse_args()
+
+    from app.core.database import engine, SessionLocal
+    from app.services.cycles import archive_closed_cycles, CYCLE_DAYS
+    from app.services.partitioning import ensure_visit_partitions, drop_empty_visit_partitions
+
+    db = SessionLocal()
+    try:
+        moved = archive_closed_cycles(db, args.territory)
+        for territory, count in sorted(moved.items()):
+            print(f"{territory}: archived {count} visits")
+
+        # Partition maintenance only applies once visits are partitioned
+        created = ensure_visit_partitions(engine, args.months_ahead)
+        dropped = drop_empty_visit_partitions(engine, datetime.utcnow() - timedelta(days=CYCLE_DAYS))
+        if created or dropped:
+            print(f"Partitions ready: {len(created)}, dropped empty: {', '.join(dropped) or 'none'}")
+    except Exception:
+        print("Error archiving visits:")
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+from app.core.database import get_read_db
+from app.core.tenancy import get_territory
+from app.services.analytics import DIMENSIONS, INTERVALS, sales_summary
+from app.schemas import SalesAnalytics
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/sales", response_model=SalesAnalytics)
+async def get_sales_analytics(
+    group_by: List[str] = Query([], description=f"Repeatable: {', '.join(DIMENSIONS)}"),
+    interval: str = Query("total", description=f"One of: {', '.join(INTERVALS)}"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
+    """Visit counts and sales over time, read from the pre-aggregated sales rollup"""
+    unknown = [name for name in group_by if name not in DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot group by: {', '.join(unknown)}")
+    if interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Invalid interval: {interval}")
+    
+    group_by = list(dict.fromkeys(group_by))
+    rows = sales_summary(db, territory, group_by, interval, start, end)
+    return SalesAnalytics(interval=interval, group_by=group_by, rows=rows)
@@ -3,7 +3,8 @@ from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.security import create_access_token, create_session
-from app.services.onedrive import onedrive_service
+from app.core.tenancy import territories_for_user
+from app.services.onedrive import OneDriveService, get_onedrive_service
 from pydantic import BaseModel
 import secrets
 
@@ -20,12 +21,12 @@ class TokenResponse(BaseModel):
 
 
 @router.get("/login")
-async def login():
+async def login(onedrive: OneDriveService = Depends(get_onedrive_service)):
     """Initiate OAuth flow with Microsoft"""
     state = secrets.token_urlsafe(32)
     auth_states[state] = True
     
-    auth_url = onedrive_service.get_auth_url(state=state)
+    auth_url = onedrive.get_auth_url(state=state)
     return {"auth_url": auth_url}
 
 
@@ -33,6 +34,7 @@ async def login():
 async def auth_callback(
     code: str = Query(...),
     state: str = Query(...),
+    onedrive: OneDriveService = Depends(get_onedrive_service),
     db: Session = Depends(get_db)
 ):
     """Handle OAuth callback from Microsoft"""
@@ -45,7 +47,7 @@ async def auth_callback(
     
     try:
         # Exchange code for tokens
-        token_result = onedrive_service.get_token_from_code(code)
+        token_result = onedrive.get_token_from_code(code)
         
         # Store tokens in session to avoid JWT truncation
         session_id = create_session(
@@ -54,10 +56,12 @@ async def auth_callback(
         )
         
         # Create our own access token (much smaller now)
+        claims = token_result.get("id_token_claims", {})
         access_token = create_access_token(
             data={
-                "sub": token_result.get("id_token_claims", {}).get("oid", "user"),
-                "session_id": session_id
+                "sub": claims.get("oid", "user"),
+                "session_id": session_id,
+                "territories": territories_for_user(claims)
             }
         )
         
@@ -72,16 +76,17 @@ async def auth_callback(
 
 
 @router.post("/refresh")
-async def refresh_token(refresh_token: str):
+async def refresh_token(refresh_token: str, onedrive: OneDriveService = Depends(get_onedrive_service)):
     """Refresh Microsoft access token"""
     try:
-        token_result = onedrive_service.refresh_token(refresh_token)
+        token_result = onedrive.refresh_token(refresh_token)
         
         # Create new access token
         access_token = create_access_token(
             data={
                 "microsoft_token": token_result["access_token"],
-                "refresh_token": token_result.get("refresh_token")
+                "refresh_token": token_result.get("refresh_token"),
+                "territories": territories_for_user(token_result.get("id_token_claims", {}))
             }
         )
         
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.tenancy import get_territory
+from app.models.customer import Customer
+from app.models.visit import Visit
+from app.models.tombstone import Tombstone
+from app.schemas import ChangeFeed
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[datetime]:
+    """Parse a change cursor (ISO timestamp) returned by a previous call.
+    
+    Cursors are naive UTC like the row timestamps; one with an offset is
+    converted to that.
+    """
+    if not cursor:
+        return None
+    
+    try:
+        parsed = datetime.fromisoformat(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+@router.get("/", response_model=ChangeFeed)
+async def get_changes(
+    since: Optional[str] = Query(None, description="Cursor from a previous response"),
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_db)
+):
+    """Get customers and visits inserted, updated or deleted after the cursor"""
+    since_dt = parse_cursor(since)
+    
+    # A full reset (route plan import) after the cursor invalidates the client replica
+    last_reset = db.query(Tombstone.deleted_at).filter(
+        Tombstone.territory == territory,
+        Tombstone.entity_type == "all"
+    ).order_by(Tombstone.deleted_at.desc()).first()
+    
+    reset = since_dt is None or (last_reset is not None and last_reset[0] > since_dt)
+    
+    customers_query = db.query(Customer).filter(Customer.territory == territory)
+    visits_query = db.query(Visit).filter(Visit.territory == territory)
+    deleted = []
+    
+    if not reset:
+        # Inclusive: rows stamped at the cursor itself may have committed after it was issued
+        customers_query = customers_query.filter(Customer.updated_at >= since_dt)
+        visits_query = visits_query.filter(Visit.updated_at >= since_dt)
+        deleted = db.query(Tombstone).filter(
+            Tombstone.territory == territory,
+            Tombstone.entity_type != "all",
+            Tombstone.deleted_at >= since_dt
+        ).order_by(Tombstone.deleted_at, Tombstone.id).all()
+    
+    customers = customers_query.all()
+    visits = visits_query.all()
+    
+    # The new cursor is the newest change the client has now seen
+    timestamps = [c.updated_at for c in customers if c.updated_at]
+    timestamps += [v.updated_at for v in visits if v.updated_at]
+    timestamps += [t.deleted_at for t in deleted]
+    if reset:
+        # A snapshot already reflects every deletion made so far
+        last_deleted = db.query(func.max(Tombstone.deleted_at)).filter(
+            Tombstone.territory == territory
+        ).scalar()
+        if last_deleted:
+            timestamps.append(last_deleted)
+    
+    cursor = max(timestamps) if timestamps else since_dt
+    
+    # Timestamps come from the app clock at flush time, so a transaction still in
+    # flight can commit rows stamped before the newest one returned here. Keep the
+    # cursor CHANGE_FEED_LAG_SECONDS behind now; rows inside the window are sent
+    # again on the next poll, which clients apply idempotently.
+    if cursor is not None:
+        cursor = min(cursor, datetime.utcnow() - timedelta(seconds=settings.CHANGE_FEED_LAG_SECONDS))
+        if reset and last_reset is not None:
+            cursor = max(cursor, last_reset[0])  # Or the same reset would be sent again
+        if since_dt is not None:
+            cursor = max(cursor, since_dt)
+    
+    return ChangeFeed(
+        cursor=cursor.isoformat() if cursor else None,
+        reset=reset,
+        customers=customers,
+        visits=visits,
+        deleted=deleted
+    )
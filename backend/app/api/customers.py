@@ -1,25 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_read_db
+from app.core.tenancy import get_territory
 from app.models.customer import Customer
 from app.models.visit import Visit
-from app.schemas import CustomerWithVisit, Customer as CustomerSchema
-from datetime import datetime
+from app.schemas import CustomerWithVisit, CustomerSearchResult, NearbyCustomer, RouteStop, Customer as CustomerSchema
+from app.services.cycles import plan_date_for, route_today
+from app.services.geo_index import geo_index
+from app.services.search_index import search_customers
+from app.services.route_cache import route_cache
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 
+CUSTOMER_LIST = TypeAdapter(List[CustomerWithVisit])
 
-@router.get("/", response_model=List[CustomerWithVisit])
-async def get_customers(
-    week_number: Optional[int] = Query(None, ge=1, le=4),
+
+def route_day_response(
+    db: Session,
+    territory: str,
+    week_number: Optional[int] = None,
     day_of_week: Optional[str] = None,
-    location: Optional[str] = None,
-    db: Session = Depends(get_db)
-):
-    """Get all customers with optional filters"""
-    query = db.query(Customer)
+    location: Optional[str] = None
+) -> Response:
+    """Customers (with visits) in stop order, served from the route-day cache when warm"""
+    key = (territory, week_number, day_of_week, location)
+    body = route_cache.get(key)
+    if body is not None:
+        # Warm hit: the session is never used, so no connection is checked out
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+    
+    generation = route_cache.generation
+    query = db.query(Customer).options(selectinload(Customer.visits)).filter(Customer.territory == territory)
     
     if week_number:
         query = query.filter(Customer.week_number == week_number)
@@ -30,48 +43,91 @@ async def get_customers(
     if location:
         query = query.filter(Customer.location == location)
     
-    customers = query.all()
+    customers = query.order_by(Customer.week_number, Customer.stop_number, Customer.id).all()
     
-    # Load visits for each customer
-    result = []
-    for customer in customers:
-        customer_dict = {
-            "id": customer.id,
-            "name": customer.name,
-            "address": customer.address,
-            "account_number": customer.account_number,
-            "week_number": customer.week_number,
-            "week_label": customer.week_label,
-            "day_of_week": customer.day_of_week,
-            "date": customer.date,
-            "location": customer.location,
-            "stop_number": customer.stop_number,
-            "visits": [
-                {
-                    "id": v.id,
-                    "customer_id": v.customer_id,
-                    "status": v.status,
-                    "notes": v.notes,
-                    "sales_amount": v.sales_amount,
-                    "follow_up_required": v.follow_up_required,
-                    "follow_up_date": v.follow_up_date,
-                    "follow_up_notes": v.follow_up_notes,
-                    "visited_at": v.visited_at,
-                    "created_at": v.created_at,
-                    "updated_at": v.updated_at
-                }
-                for v in customer.visits
-            ]
-        }
-        result.append(customer_dict)
+    body = CUSTOMER_LIST.dump_json(CUSTOMER_LIST.validate_python(customers, from_attributes=True))
+    route_cache.set(key, body, [c.id for c in customers], generation)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+
+@router.get("/", response_model=List[CustomerWithVisit])
+async def get_customers(
+    week_number: Optional[int] = Query(None, ge=1, le=4),
+    day_of_week: Optional[str] = None,
+    location: Optional[str] = None,
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
+    """Get all customers with optional filters"""
+    return route_day_response(db, territory, week_number, day_of_week, location)
+
+
+@router.get("/search", response_model=List[CustomerSearchResult])
+async def search_customers_endpoint(
+    q: str = Query(..., min_length=2),
+    limit: int = Query(20, ge=1, le=100),
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
+    """Fuzzy search by customer name, address or account number"""
+    results = search_customers(db, territory, q.strip(), limit=limit)
     
-    return result
+    return [
+        CustomerSearchResult(**CustomerSchema.model_validate(customer).model_dump(), score=score)
+        for customer, score in results
+    ]
+
+
+@router.get("/nearby", response_model=List[NearbyCustomer])
+def get_nearby_customers(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=100),
+    max_km: Optional[float] = Query(None, gt=0),
+    exclude_today: bool = Query(False, description="Leave out customers on today's route"),
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
+    """The k nearest customers with coordinates, with their latest visit status"""
+    grid = geo_index.get(db, territory)
+    if grid.anchor is None:
+        return []
+    
+    today = route_today()
+    exclude_date = plan_date_for(grid.anchor, today) if exclude_today else None
+    nearest = grid.nearest(lat, lng, k, max_km, exclude_date)
+    if not nearest:
+        return []
+    
+    ids = [customer_id for _, customer_id in nearest]
+    rows = db.query(Customer).filter(
+        Customer.territory == territory,
+        Customer.id.in_(ids)
+    ).all()
+    
+    by_id = {customer.id: customer for customer in rows}
+    results = []
+    for distance, customer_id in nearest:
+        if customer_id not in by_id:
+            continue  # Deleted since the index was built
+        results.append(NearbyCustomer(
+            **RouteStop.model_validate(by_id[customer_id]).model_dump(),
+            distance_km=round(distance, 3)
+        ))
+    return results
 
 
 @router.get("/{customer_id}", response_model=CustomerWithVisit)
-async def get_customer(customer_id: int, db: Session = Depends(get_db)):
+async def get_customer(
+    customer_id: int,
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
     """Get a specific customer by ID"""
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    customer = db.query(Customer).filter(
+        Customer.territory == territory,
+        Customer.id == customer_id
+    ).first()
     
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
@@ -80,9 +136,14 @@ async def get_customer(customer_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/account/{account_number}", response_model=CustomerWithVisit)
-async def get_customer_by_account(account_number: str, db: Session = Depends(get_db)):
+async def get_customer_by_account(
+    account_number: str,
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
     """Get a customer by account number"""
     customer = db.query(Customer).filter(
+        Customer.territory == territory,
         Customer.account_number == account_number
     ).first()
     
@@ -96,14 +157,8 @@ async def get_customer_by_account(account_number: str, db: Session = Depends(get
 async def get_customers_by_week_and_day(
     week_number: int,
     day_of_week: str,
-    db: Session = Depends(get_db)
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
 ):
     """Get all customers for a specific week and day"""
-    customers = db.query(Customer).filter(
-        and_(
-            Customer.week_number == week_number,
-            Customer.day_of_week == day_of_week
-        )
-    ).order_by(Customer.stop_number).all()
-    
-    return customers
+    return route_day_response(db, territory, week_number, day_of_week)
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+from app.core.tenancy import get_territory
+from app.services.events import event_broker
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+KEEPALIVE_SECONDS = 15
+
+
+@router.get("/")
+async def stream_events(request: Request, territory: str = Depends(get_territory)):
+    """Server-Sent Events stream of visit and route plan changes"""
+    queue = event_broker.subscribe(territory)
+    
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                event_type = json.loads(message)["type"]
+                yield f"event: {event_type}\ndata: {message}\n\n"
+        finally:
+            event_broker.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
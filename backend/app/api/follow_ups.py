@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, contains_eager
+from typing import Optional, Tuple
+from datetime import datetime, date, time, timedelta
+from app.core.database import get_read_db
+from app.core.tenancy import get_territory
+from app.models.customer import Customer
+from app.models.visit import Visit
+from app.schemas import FollowUpPage
+
+router = APIRouter(prefix="/follow-ups", tags=["follow-ups"])
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Parse a follow-up cursor ("<follow_up_date ISO>,<visit id>") from a previous page"""
+    if not cursor:
+        return None
+    
+    try:
+        follow_up_date, visit_id = cursor.rsplit(",", 1)
+        return datetime.fromisoformat(follow_up_date), int(visit_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/", response_model=FollowUpPage)
+async def get_follow_ups(
+    due_before: Optional[date] = Query(None, description="Only follow-ups due before this date (default: due by end of today)"),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
+    """Due and overdue follow-ups, oldest first, with their customers.
+    
+    Served from the partial index ix_visits_territory_follow_up and paginated
+    by (follow_up_date, id), so each page is one index range scan no matter
+    how many visits or pages precede it. Follow-ups without a date are not
+    listed.
+    """
+    if due_before is None:
+        due_before = datetime.utcnow().date() + timedelta(days=1)
+    
+    query = db.query(Visit).join(Customer, Customer.id == Visit.customer_id).options(
+        contains_eager(Visit.customer)
+    ).filter(
+        Visit.territory == territory,
+        Visit.follow_up_required == True,
+        Visit.follow_up_date < datetime.combine(due_before, time.min)
+    )
+    
+    cursor = parse_cursor(after)
+    if cursor:
+        follow_up_date, visit_id = cursor
+        query = query.filter(or_(
+            Visit.follow_up_date > follow_up_date,
+            and_(Visit.follow_up_date == follow_up_date, Visit.id > visit_id)
+        ))
+    
+    # One extra row tells whether another page exists
+    visits = query.order_by(Visit.follow_up_date, Visit.id).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(visits) > limit:
+        visits = visits[:limit]
+        next_cursor = f"{visits[-1].follow_up_date.isoformat()},{visits[-1].id}"
+    
+    return FollowUpPage(items=visits, next_cursor=next_cursor)
@@ -0,0 +1,218 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from collections import defaultdict
+from datetime import date, timedelta
+import asyncio
+from app.core.database import get_db, get_read_db
+from app.core.tenancy import get_territory
+from app.models.customer import Customer
+from app.models.visit import Visit
+from app.services.cycles import CYCLE_DAYS, cycle_start_for, latest_visit_subquery, plan_date_for, route_today
+from app.services.events import event_broker
+from app.services.latest_visits import latest_visit_in_cycle
+from app.services.route_cache import route_cache
+from app.schemas import DailyRoute, RouteDayProposal, RouteStop, RouteStopProposal, Customer as CustomerSchema
+
+router = APIRouter(prefix="/routes", tags=["routes"])
+
+
+async def build_route_proposals(
+    db: Session,
+    territory: str,
+    week_number: Optional[int] = None,
+    day_of_week: Optional[str] = None
+) -> List[RouteDayProposal]:
+    """Group customers by (week, day) and propose a shorter stop order for each"""
+    query = db.query(Customer).filter(Customer.territory == territory)
+    
+    if week_number:
+        query = query.filter(Customer.week_number == week_number)
+    
+    if day_of_week:
+        query = query.filter(Customer.day_of_week == day_of_week)
+    
+    customers = query.order_by(
+        Customer.week_number, Customer.day_of_week, Customer.stop_number
+    ).all()
+    
+    route_days = defaultdict(list)
+    for customer in customers:
+        route_days[(customer.week_number, customer.day_of_week)].append(customer)
+    
+    # Only stops with coordinates can be reordered
+    groups = {
+        key: [(c.latitude, c.longitude) for c in stops if c.latitude is not None and c.longitude is not None]
+        for key, stops in route_days.items()
+    }
+    groups = {key: coords for key, coords in groups.items() if len(coords) >= 3}
+    
+    # Deferred so NumPy is only loaded once a route is optimized
+    from app.services.route_optimizer import optimize_route_days
+    
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(None, optimize_route_days, groups)
+    
+    proposals = []
+    for (week, day), stops in route_days.items():
+        located = [c for c in stops if c.latitude is not None and c.longitude is not None]
+        unlocated = len(stops) - len(located)
+        
+        ordered = stops
+        current_km = proposed_km = 0.0
+        if (week, day) in results:
+            order, current_km, proposed_km = results[(week, day)]
+            if proposed_km < current_km:
+                # Located stops take the optimized order; stops without coordinates keep their slots
+                optimized = iter([located[i] for i in order])
+                ordered = [next(optimized) if c.latitude is not None and c.longitude is not None else c for c in stops]
+            else:
+                proposed_km = current_km
+        
+        proposals.append(RouteDayProposal(
+            week_number=week,
+            day_of_week=day,
+            current_distance_km=round(current_km, 3),
+            proposed_distance_km=round(proposed_km, 3),
+            stops_without_coordinates=unlocated,
+            stops=[
+                RouteStopProposal(
+                    customer_id=c.id,
+                    name=c.name,
+                    current_stop=c.stop_number,
+                    # Slots keep their stop numbers; only who fills them changes
+                    proposed_stop=slot.stop_number if slot.stop_number is not None else position
+                )
+                for position, (slot, c) in enumerate(zip(stops, ordered), start=1)
+            ]
+        ))
+    
+    return proposals
+
+
+@router.get("/optimize", response_model=List[RouteDayProposal])
+async def get_route_optimization(
+    week_number: Optional[int] = Query(None, ge=1, le=4),
+    day_of_week: Optional[str] = None,
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_db)
+):
+    """Propose a shorter stop order for each route-day"""
+    return await build_route_proposals(db, territory, week_number, day_of_week)
+
+
+@router.post("/optimize/apply", response_model=List[RouteDayProposal])
+async def apply_route_optimization(
+    week_number: Optional[int] = Query(None, ge=1, le=4),
+    day_of_week: Optional[str] = None,
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_db)
+):
+    """Apply the proposed stop order to the route plan"""
+    proposals = await build_route_proposals(db, territory, week_number, day_of_week)
+    
+    stop_numbers = {
+        stop.customer_id: stop.proposed_stop
+        for proposal in proposals
+        for stop in proposal.stops
+        if stop.current_stop != stop.proposed_stop
+    }
+    
+    for customer in db.query(Customer).filter(
+        Customer.territory == territory,
+        Customer.id.in_(stop_numbers)
+    ).all():
+        customer.stop_number = stop_numbers[customer.id]
+    
+    db.commit()
+    
+    event_broker.publish("route_plan.reordered", {"customers": len(stop_numbers)}, territory)
+    
+    return proposals
+
+
+def daily_route_response(db: Session, territory: str, day: date) -> Response:
+    """Stops worked on `day` in stop order, each with its latest visit in that cycle.
+    
+    The route plan repeats every CYCLE_DAYS from its first date, so `day` maps to
+    one plan date served by ix_customers_territory_date. Responses are cached per
+    date and dropped by the same visit and import events as route-day lists.
+    """
+    key = (territory, "date", day)
+    body = route_cache.get(key)
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+    
+    generation = route_cache.generation
+    anchor = db.query(func.min(Customer.date)).filter(Customer.territory == territory).scalar()
+    if anchor is None:
+        return Response(content=DailyRoute(date=day).model_dump_json(), media_type="application/json")
+    
+    plan_date = plan_date_for(anchor, day)
+    cycle_start = cycle_start_for(anchor, day)
+    
+    if cycle_start == cycle_start_for(anchor, route_today()):
+        # Active cycle: the customers carry their latest visit, no join needed
+        # (unless it is still last cycle's, before archive_visits.py has run)
+        in_cycle = latest_visit_in_cycle(cycle_start)
+        rows = db.query(
+            Customer,
+            case((in_cycle, Customer.latest_status), else_=None),
+            case((in_cycle, Customer.latest_visited_at), else_=None)
+        )
+    else:
+        # Latest visit per stop within the cycle containing `day`, joined in the same query
+        latest = latest_visit_subquery(
+            Visit.territory == territory,
+            Visit.created_at >= cycle_start,
+            Visit.created_at < cycle_start + timedelta(days=CYCLE_DAYS),
+            Visit.customer_id.in_(
+                select(Customer.id).where(Customer.territory == territory, Customer.date == plan_date)
+            )
+        )
+        rows = db.query(Customer, latest.c.status, latest.c.visited_at).outerjoin(
+            latest, (latest.c.customer_id == Customer.id) & (latest.c.rank == 1)
+        )
+    
+    rows = rows.filter(
+        Customer.territory == territory,
+        Customer.date == plan_date
+    ).order_by(Customer.stop_number, Customer.id).all()
+    
+    route = DailyRoute(
+        date=day,
+        plan_date=plan_date,
+        week_number=rows[0][0].week_number if rows else None,
+        day_of_week=rows[0][0].day_of_week if rows else None,
+        stops=[
+            RouteStop(
+                **CustomerSchema.model_validate(customer).model_dump(),
+                latest_status=status,
+                latest_visited_at=visited_at
+            )
+            for customer, status, visited_at in rows
+        ]
+    )
+    body = route.model_dump_json().encode()
+    route_cache.set(key, body, [customer.id for customer, _, _ in rows], generation)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+
+@router.get("/today", response_model=DailyRoute)
+async def get_todays_route(
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
+    """Today's stops (in ROUTE_TIMEZONE) with their latest visit status"""
+    return daily_route_response(db, territory, route_today())
+
+
+@router.get("/{route_date}", response_model=DailyRoute)
+async def get_route_for_date(
+    route_date: date,
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
+    """Stops for a date (in any cycle of the route plan) with their latest visit status"""
+    return daily_route_response(db, territory, route_date)
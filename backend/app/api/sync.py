@@ -1,21 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Header, UploadFile, File, Query, Request
 from fastapi.responses import FileResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
+import hashlib
 import tempfile
+import logging
 import os
 
-from app.core.database import get_db
+from app.core.database import get_read_db, read_session_factory, SessionLocal
+from app.core.tenancy import get_territory
+from app.core.metrics import SYNC_REJECTED, SYNC_ROWS
 from app.core.security import decode_access_token, get_session
 from app.models.customer import Customer
 from app.models.visit import Visit
-from app.services.onedrive import onedrive_service
+from app.models.tombstone import Tombstone
+from app.services.onedrive import OneDriveService, get_onedrive_service
+from app.services.route_plan import replace_route_plan
+from app.services.cycles import active_cycle_start, visits_since_filter
 from app.services.excel_parser import parse_excel_route_plan, export_tracking_data
-from app.schemas import SyncResponse
+from app.services.export_cache import CachedExport, export_cache
+from app.services.route_table import RoutePlanTable
+from app.services.jobs import Job, job_manager
+from app.services.sync_governor import sync_governor
+from app.schemas import SyncResponse, JobStatus
 from app.core.config import settings
 
 router = APIRouter(prefix="/sync", tags=["sync"])
+logger = logging.getLogger(__name__)
 
 
 def get_microsoft_token(authorization: str = Header(...)):
@@ -24,7 +37,7 @@ def get_microsoft_token(authorization: str = Header(...)):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
     
     token = authorization[7:] # Remove 'Bearer ' or 'bearer '
-    print(f"RECEIVED TOKEN LENGTH: {len(token)}")
+    logger.debug("Received bearer token", extra={"token_length": len(token)})
     payload = decode_access_token(token)
     
     if not payload:
@@ -46,132 +59,123 @@ def get_microsoft_token(authorization: str = Header(...)):
     return microsoft_token
 
 
-@router.post("/upload", response_model=SyncResponse)
-async def upload_route_plan(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
-):
-    """Directly upload a route plan Excel file and save to Supabase"""
-    print(f"DEBUG: Received upload request for file: {file.filename}")
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="Invalid file format. Please upload an Excel file.")
+def admit_sync_job(kind: str):
+    """Reject a new import/export job with 429 while too many are already pending"""
+    retry_after = sync_governor.admit()
+    if retry_after is not None:
+        SYNC_REJECTED.labels(kind).inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Too many sync jobs in progress, please retry later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+def tracking_fingerprint(db: Session, territory: str, cycle_start: Optional[datetime]) -> str:
+    """Fingerprint of the data a tracking export contains, from three index-only aggregates.
     
-    try:
-        # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
-        
+    Any insert, update or delete of a customer or active-cycle visit changes a
+    count, a max(updated_at) or the newest tombstone.
+    """
+    customers = db.query(func.count(Customer.id), func.max(Customer.updated_at)).filter(
+        Customer.territory == territory
+    ).one()
+    visits = db.query(func.count(Visit.id), func.max(Visit.updated_at)).filter(
+        *visits_since_filter(territory, cycle_start)
+    ).one()
+    last_deleted = db.query(func.max(Tombstone.deleted_at)).filter(
+        Tombstone.territory == territory
+    ).scalar()
+    
+    state = repr((territory, cycle_start, tuple(customers), tuple(visits), last_deleted))
+    return hashlib.sha256(state.encode()).hexdigest()[:32]
+
+
+def load_tracking_data(
+    db: Session,
+    territory: str,
+    cycle_start: Optional[datetime]
+) -> Tuple[RoutePlanTable, List[Optional[dict]]]:
+    """Get a territory's customers with their latest visits in the cycle starting at cycle_start.
+    
+    One query: each customer is joined to the visit its latest_visit_id points at,
+    unless that visit predates the cycle (archive_visits.py has not run since the
+    rollover).
+    """
+    join_on = Visit.id == Customer.latest_visit_id
+    if cycle_start is not None:
+        join_on &= Visit.created_at >= cycle_start
+    rows = db.query(Customer, Visit).outerjoin(Visit, join_on).filter(Customer.territory == territory).all()
+    
+    table = RoutePlanTable()
+    latest_visits = []
+    for customer, latest_visit in rows:
+        table.append(
+            customer.name, customer.address, customer.account_number,
+            customer.latitude, customer.longitude, customer.week_number, customer.week_label,
+            customer.day_of_week, customer.date, customer.location, customer.stop_number
+        )
+        latest_visits.append({
+            "status": latest_visit.status,
+            "visited_at": latest_visit.visited_at,
+            "notes": latest_visit.notes,
+            "sales_amount": latest_visit.sales_amount,
+            "follow_up_required": latest_visit.follow_up_required,
+            "follow_up_date": latest_visit.follow_up_date
+        } if latest_visit else None)
+    
+    return table, latest_visits
+
+
+def job_status(job: Job, request: Request) -> JobStatus:
+    artifact_url = None
+    if job.artifact_path and job.status == "succeeded":
+        artifact_url = str(request.url_for("download_job_artifact", job_id=job.id))
+    
+    return JobStatus(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        stage=job.stage,
+        stages=list(job.stages.values()),
+        progress=job.progress,
+        result=job.result,
+        artifact_url=artifact_url,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at
+    )
+
+
+# Job bodies (run on the job worker pool with their own DB session)
+
+def run_import_job(job: Job, territory: str, file_path: str, message: str) -> dict:
+    with sync_governor.cpu_slot(), job.run_stage("parse"):
+        customers_data = parse_excel_route_plan(file_path)
+    
+    # One import per territory at a time; concurrent deletes and reinserts interleave or deadlock
+    with sync_governor.dataset_lock(territory), job.run_stage("write"):
+        db = SessionLocal()
         try:
-            # Parse Excel file using existing logic
-            customers_data = parse_excel_route_plan(tmp_path)
-            
-            # Clear existing data
-            db.query(Visit).delete()
-            db.query(Customer).delete()
-            
-            # Insert new customers
-            customers_count = 0
-            for customer_data in customers_data:
-                customer = Customer(**customer_data)
-                db.add(customer)
-                customers_count += 1
-            
-            db.commit()
-            
-            return SyncResponse(
-                success=True,
-                message=f"Successfully imported {customers_count} customers from file",
-                customers_synced=customers_count,
-                last_sync=datetime.utcnow()
-            )
-            
+            customers_count = replace_route_plan(db, territory, customers_data)
         finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-                
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
-
-
-@router.get("/download")
-async def download_tracking_data(db: Session = Depends(get_db)):
-    """Generate and return a tracking Excel file for download"""
-    try:
-        # Get all customers with their latest visits (existing logic reused)
-        customers = db.query(Customer).all()
-        
-        customers_data = []
-        for customer in customers:
-            latest_visit = db.query(Visit).filter(
-                Visit.customer_id == customer.id
-            ).order_by(Visit.updated_at.desc()).first()
-            
-            customer_dict = {
-                "name": customer.name,
-                "address": customer.address,
-                "account_number": customer.account_number,
-                "week_number": customer.week_number,
-                "week_label": customer.week_label,
-                "day_of_week": customer.day_of_week,
-                "date": customer.date,
-                "location": customer.location,
-                "stop_number": customer.stop_number,
-                "latest_visit": {
-                    "status": latest_visit.status if latest_visit else "not_visited",
-                    "visited_at": latest_visit.visited_at if latest_visit else None,
-                    "notes": latest_visit.notes if latest_visit else "",
-                    "sales_amount": latest_visit.sales_amount if latest_visit else 0.0,
-                    "follow_up_required": latest_visit.follow_up_required if latest_visit else False,
-                    "follow_up_date": latest_visit.follow_up_date if latest_visit else None
-                }
-            }
-            customers_data.append(customer_dict)
-        
-        # Create temporary Excel file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp_file:
-            tmp_path = tmp_file.name
-        
-        try:
-            # Export to Excel
-            export_tracking_data(customers_data, tmp_path)
-            
-            # Generate descriptive filename
-            today = datetime.now().strftime("%Y-%m-%d")
-            filename = f"Route_Tracking_Backup_{today}.xlsx"
-            
-            return FileResponse(
-                path=tmp_path,
-                filename=filename,
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        except Exception as e:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-            raise e
-            
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
+            db.close()
+    
+    SYNC_ROWS.labels(job.kind).inc(customers_count)
+    
+    return SyncResponse(
+        success=True,
+        message=message.format(count=customers_count),
+        customers_synced=customers_count,
+        last_sync=datetime.utcnow()
+    ).model_dump(mode="json")
 
 
-@router.post("/import", response_model=SyncResponse)
-async def sync_from_onedrive(
-    authorization: str = Header(...),
-    db: Session = Depends(get_db)
-):
-    """Import route plan from OneDrive Excel file"""
-    
-    try:
-        microsoft_token = get_microsoft_token(authorization)
-        
+def run_onedrive_import_job(job: Job, territory: str, onedrive: OneDriveService, microsoft_token: str) -> dict:
+    # Failures are logged with their traceback by the job manager
+    with job.run_stage("download"):
         # Download file from OneDrive
-        file_content = onedrive_service.get_file_content(
+        file_content = onedrive.get_file_content(
             microsoft_token,
             settings.ONEDRIVE_FILE_PATH
         )
@@ -179,131 +183,212 @@ async def sync_from_onedrive(
         # Save to temporary file
         with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp_file:
             tmp_file.write(file_content)
-            tmp_path = tmp_file.name
-        
+            job.input_path = tmp_file.name
+    
+    return run_import_job(job, territory, job.input_path, "Successfully synced {count} customers from OneDrive")
+
+
+def run_tracking_export(job: Job, territory: str, session_factory=SessionLocal) -> Tuple[CachedExport, bool]:
+    """Get the territory's tracking workbook, rebuilding it only if the data changed.
+    
+    Returns the cached export and whether it was freshly generated.
+    """
+    with job.run_stage("query"):
+        db = session_factory()
         try:
-            # Parse Excel file
-            customers_data = parse_excel_route_plan(tmp_path)
-            
-            # Clear existing customers (if any)
-            db.query(Visit).delete()
-            db.query(Customer).delete()
-            
-            # Insert customers
-            customers_count = 0
-            for customer_data in customers_data:
-                customer = Customer(**customer_data)
-                db.add(customer)
-                customers_count += 1
-            
-            db.commit()
-            
-            return SyncResponse(
-                success=True,
-                message=f"Successfully synced {customers_count} customers from OneDrive",
-                customers_synced=customers_count,
-                last_sync=datetime.utcnow()
-            )
-            
+            cycle_start = active_cycle_start(db, territory)
+            fingerprint = tracking_fingerprint(db, territory, cycle_start)
+            export = export_cache.get(territory, fingerprint)
+            if export is None:
+                # Read after the fingerprint, so the data is at least as new as it
+                customers, latest_visits = load_tracking_data(db, territory, cycle_start)
         finally:
-            # Clean up temp file
-            os.unlink(tmp_path)
-            
-    except Exception as e:
-        import traceback
-        error_msg = f"DEBUG SYNC ERROR: {str(e)}"
-        print(error_msg)
-        with open("sync_error.log", "a") as f:
-            f.write(f"\n--- {datetime.now()} ---\n")
-            f.write(error_msg + "\n")
-            f.write(traceback.format_exc() + "\n")
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Sync failed: {str(e)}")
-
-
-@router.post("/export", response_model=SyncResponse)
-async def sync_to_onedrive(
-    authorization: str = Header(...),
-    db: Session = Depends(get_db)
-):
-    """Export tracking data to OneDrive"""
+            db.close()
     
-    try:
-        microsoft_token = get_microsoft_token(authorization)
-        
-        # Get all customers with their latest visits
-        customers = db.query(Customer).all()
-        
-        customers_data = []
-        for customer in customers:
-            latest_visit = db.query(Visit).filter(
-                Visit.customer_id == customer.id
-            ).order_by(Visit.updated_at.desc()).first()
-            
-            customer_dict = {
-                "name": customer.name,
-                "address": customer.address,
-                "account_number": customer.account_number,
-                "week_number": customer.week_number,
-                "week_label": customer.week_label,
-                "day_of_week": customer.day_of_week,
-                "date": customer.date,
-                "location": customer.location,
-                "stop_number": customer.stop_number,
-                "latest_visit": {
-                    "status": latest_visit.status if latest_visit else "not_visited",
-                    "visited_at": latest_visit.visited_at if latest_visit else None,
-                    "notes": latest_visit.notes if latest_visit else "",
-                    "sales_amount": latest_visit.sales_amount if latest_visit else 0.0,
-                    "follow_up_required": latest_visit.follow_up_required if latest_visit else False,
-                    "follow_up_date": latest_visit.follow_up_date if latest_visit else None
-                }
-            }
-            customers_data.append(customer_dict)
-        
-        # Create temporary Excel file
+    if export is not None:
+        with job.run_stage("generate"):
+            return export, False
+    
+    with sync_governor.cpu_slot(), job.run_stage("generate"):
         with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp_file:
             tmp_path = tmp_file.name
-        
-        try:
-            # Export to Excel
-            export_tracking_data(customers_data, tmp_path)
-            
+        export_tracking_data(customers, tmp_path, latest_visits)
+        export = export_cache.put(territory, fingerprint, tmp_path, len(customers))
+    
+    SYNC_ROWS.labels(job.kind).inc(len(customers))
+    return export, True
+
+
+def run_download_job(job: Job, territory: str, session_factory) -> dict:
+    export, fresh = run_tracking_export(job, territory, session_factory)
+    
+    # Generate descriptive filename
+    today = datetime.now().strftime("%Y-%m-%d")
+    job.set_artifact(export_cache.link(export), f"Route_Tracking_Backup_{today}.xlsx")
+    
+    return {"customers_exported": export.customers, "cached": not fresh}
+
+
+def run_onedrive_export_job(
+    job: Job,
+    territory: str,
+    onedrive: OneDriveService,
+    microsoft_token: str,
+    force: bool = False
+) -> dict:
+    export, _ = run_tracking_export(job, territory)
+    export_path = settings.ONEDRIVE_FILE_PATH.replace(".xlsx", "_Tracking.xlsx")
+    
+    with job.run_stage("upload"):
+        unchanged = not force and export_cache.uploaded(territory, export_path) == export.fingerprint
+        if not unchanged:
             # Read file content
-            with open(tmp_path, 'rb') as f:
+            with open(export.path, 'rb') as f:
                 file_content = f.read()
             
             # Upload to OneDrive
-            export_path = settings.ONEDRIVE_FILE_PATH.replace(".xlsx", "_Tracking.xlsx")
-            onedrive_service.upload_file_content(
+            onedrive.upload_file_content(
                 microsoft_token,
                 export_path,
                 file_content
             )
-            
-            return SyncResponse(
-                success=True,
-                message=f"Successfully exported tracking data to OneDrive",
-                customers_synced=len(customers_data),
-                last_sync=datetime.utcnow()
-            )
-            
-        finally:
-            # Clean up temp file
-            os.unlink(tmp_path)
-            
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+            export_cache.mark_uploaded(territory, export_path, export.fingerprint)
+    
+    return SyncResponse(
+        success=True,
+        message="Tracking data unchanged since the last export; upload skipped" if unchanged
+        else "Successfully exported tracking data to OneDrive",
+        customers_synced=export.customers,
+        last_sync=datetime.utcnow(),
+        cached=unchanged
+    ).model_dump(mode="json")
+
+
+@router.post("/upload", response_model=JobStatus, status_code=202)
+async def upload_route_plan(
+    request: Request,
+    file: UploadFile = File(...),
+    territory: str = Depends(get_territory)
+):
+    """Upload a route plan Excel file; it is parsed and saved by a background job"""
+    logger.info("Route plan upload received", extra={"upload_filename": file.filename, "territory": territory})
+    if not file.filename.endswith(('.xlsx', '.xls')):
+        raise HTTPException(status_code=400, detail="Invalid file format. Please upload an Excel file.")
+    admit_sync_job("upload")
+    
+    # Save uploaded file to temporary location
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp_file:
+        content = await file.read()
+        tmp_file.write(content)
+        tmp_path = tmp_file.name
+    
+    job = job_manager.submit(
+        territory, "upload", ["parse", "write"], run_import_job,
+        tmp_path, "Successfully imported {count} customers from file",
+        input_path=tmp_path
+    )
+    
+    return job_status(job, request)
+
+
+@router.get("/download", response_model=JobStatus, status_code=202)
+async def download_tracking_data(request: Request, territory: str = Depends(get_territory)):
+    """Start a tracking Excel export (reused if nothing changed); fetch it from the job's artifact URL"""
+    admit_sync_job("download")
+    job = job_manager.submit(
+        territory, "download", ["query", "generate"], run_download_job, read_session_factory(territory)
+    )
+    return job_status(job, request)
+
+
+@router.post("/import", response_model=JobStatus, status_code=202)
+async def sync_from_onedrive(
+    request: Request,
+    authorization: str = Header(...),
+    territory: str = Depends(get_territory),
+    onedrive: OneDriveService = Depends(get_onedrive_service)
+):
+    """Import route plan from OneDrive Excel file in a background job"""
+    microsoft_token = get_microsoft_token(authorization)
+    admit_sync_job("import")
+    
+    job = job_manager.submit(
+        territory, "import", ["download", "parse", "write"], run_onedrive_import_job, onedrive, microsoft_token
+    )
+    return job_status(job, request)
+
+
+@router.post("/export", response_model=JobStatus, status_code=202)
+async def sync_to_onedrive(
+    request: Request,
+    authorization: str = Header(...),
+    force: bool = Query(False, description="Upload even if nothing changed since the last export"),
+    territory: str = Depends(get_territory),
+    onedrive: OneDriveService = Depends(get_onedrive_service)
+):
+    """Export tracking data to OneDrive in a background job (skipped if unchanged)"""
+    microsoft_token = get_microsoft_token(authorization)
+    admit_sync_job("export")
+    
+    job = job_manager.submit(
+        territory, "export", ["query", "generate", "upload"], run_onedrive_export_job,
+        onedrive, microsoft_token, force
+    )
+    return job_status(job, request)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, request: Request, territory: str = Depends(get_territory)):
+    """Get progress and result of a sync job"""
+    job = job_manager.get(job_id, territory)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job_status(job, request)
+
+
+@router.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str, request: Request, territory: str = Depends(get_territory)):
+    """Cancel a queued or running sync job"""
+    job = job_manager.cancel(job_id, territory)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job_status(job, request)
+
+
+@router.get("/jobs/{job_id}/artifact")
+async def download_job_artifact(job_id: str, territory: str = Depends(get_territory)):
+    """Download the file produced by a finished job"""
+    job = job_manager.get(job_id, territory)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job.status != "succeeded" or not job.artifact_path or not os.path.exists(job.artifact_path):
+        raise HTTPException(status_code=409, detail="Job has no artifact available")
+    
+    return FileResponse(
+        path=job.artifact_path,
+        filename=job.artifact_filename,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
 
 
 @router.get("/status")
-async def get_sync_status(db: Session = Depends(get_db)):
+async def get_sync_status(
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
     """Get current sync status"""
-    total_customers = db.query(Customer).count()
-    total_visits = db.query(Visit).count()
+    total_customers = db.query(Customer).filter(Customer.territory == territory).count()
+    total_visits = db.query(Visit).filter(Visit.territory == territory).count()
     
     return {
         "total_customers": total_customers,
         "total_visits": total_visits,
-        "has_data": total_customers > 0
+        "has_data": total_customers > 0,
+        "jobs": sync_governor.stats()
     }
@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from sqlalchemy import and_, case, func
+from typing import List, Union
 from datetime import datetime
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.tenancy import get_territory
 from app.models.customer import Customer
 from app.models.visit import Visit
+from app.models.tombstone import Tombstone
+from app.models.visit_archive import VisitArchive
+from app.services.analytics import record_visit_change, visit_contribution
+from app.services.cycles import active_cycle_start, hot_visits_filter, visits_since_filter
+from app.services.events import event_broker, visit_event_data
+from app.services.latest_visits import latest_visit_in_cycle, refresh_latest_visit, set_latest_visit
 from app.schemas import (
+    ArchivedVisit,
     Visit as VisitSchema,
     VisitCreate,
     VisitUpdate,
@@ -16,25 +24,67 @@ from app.schemas import (
 router = APIRouter(prefix="/visits", tags=["visits"])
 
 
-@router.get("/", response_model=List[VisitSchema])
-async def get_visits(db: Session = Depends(get_db)):
-    """Get all visits"""
-    visits = db.query(Visit).all()
+@router.get("/", response_model=List[Union[VisitSchema, ArchivedVisit]])
+async def get_visits(
+    include_history: bool = Query(False, description="Include closed route cycles and archived visits"),
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
+    """Get visits in the active route cycle"""
+    visits = [
+        VisitSchema.model_validate(visit)
+        for visit in db.query(Visit).filter(*hot_visits_filter(db, territory, include_history))
+    ]
+    
+    if include_history:
+        visits += [
+            ArchivedVisit.model_validate(visit)
+            for visit in db.query(VisitArchive).filter(VisitArchive.territory == territory)
+        ]
+    
     return visits
 
 
-@router.get("/customer/{customer_id}", response_model=List[VisitSchema])
-async def get_customer_visits(customer_id: int, db: Session = Depends(get_db)):
-    """Get all visits for a specific customer"""
-    visits = db.query(Visit).filter(Visit.customer_id == customer_id).all()
+@router.get("/customer/{customer_id}", response_model=List[Union[VisitSchema, ArchivedVisit]])
+async def get_customer_visits(
+    customer_id: int,
+    include_history: bool = Query(False, description="Include closed route cycles and archived visits"),
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
+    """Get a customer's visits in the active route cycle"""
+    visits = [
+        VisitSchema.model_validate(visit)
+        for visit in db.query(Visit).filter(
+            *hot_visits_filter(db, territory, include_history),
+            Visit.customer_id == customer_id
+        )
+    ]
+    
+    if include_history:
+        visits += [
+            ArchivedVisit.model_validate(visit)
+            for visit in db.query(VisitArchive).filter(
+                VisitArchive.territory == territory,
+                VisitArchive.customer_id == customer_id
+            )
+        ]
+    
     return visits
 
 
 @router.post("/", response_model=VisitSchema)
-async def create_visit(visit: VisitCreate, db: Session = Depends(get_db)):
+async def create_visit(
+    visit: VisitCreate,
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_db)
+):
     """Create a new visit"""
-    # Verify customer exists
-    customer = db.query(Customer).filter(Customer.id == visit.customer_id).first()
+    # Verify customer exists (locked: concurrent writes update its latest visit)
+    customer = db.query(Customer).filter(
+        Customer.territory == territory,
+        Customer.id == visit.customer_id
+    ).with_for_update().first()
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
@@ -45,6 +95,7 @@ async def create_visit(visit: VisitCreate, db: Session = Depends(get_db)):
     
     db_visit = Visit(
         customer_id=visit.customer_id,
+        territory=customer.territory,
         status=visit.status,
         notes=visit.notes,
         sales_amount=visit.sales_amount,
@@ -55,9 +106,14 @@ async def create_visit(visit: VisitCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_visit)
+    db.flush()
+    record_visit_change(db, None, visit_contribution(db_visit, customer))
+    set_latest_visit(customer, db_visit)
     db.commit()
     db.refresh(db_visit)
     
+    event_broker.publish("visit.created", visit_event_data(db_visit), territory)
+    
     return db_visit
 
 
@@ -65,14 +121,20 @@ async def create_visit(visit: VisitCreate, db: Session = Depends(get_db)):
 async def update_visit(
     visit_id: int,
     visit_update: VisitUpdate,
+    territory: str = Depends(get_territory),
     db: Session = Depends(get_db)
 ):
     """Update an existing visit"""
-    db_visit = db.query(Visit).filter(Visit.id == visit_id).first()
+    db_visit = db.query(Visit).filter(
+        Visit.territory == territory,
+        Visit.id == visit_id
+    ).first()
     
     if not db_visit:
         raise HTTPException(status_code=404, detail="Visit not found")
     
+    customer = db.query(Customer).filter(Customer.id == db_visit.customer_id).with_for_update().one()
+    
     # Update fields
     update_data = visit_update.model_dump(exclude_unset=True)
     
@@ -81,68 +143,108 @@ async def update_visit(
         if not db_visit.visited_at:
             update_data["visited_at"] = datetime.utcnow()
     
+    before = visit_contribution(db_visit, db_visit.customer)
     for field, value in update_data.items():
         setattr(db_visit, field, value)
+    record_visit_change(db, before, visit_contribution(db_visit, db_visit.customer))
+    
+    # The edited visit is now the newest, unless it belongs to a closed cycle
+    db.flush()
+    refresh_latest_visit(db, customer, active_cycle_start(db, territory))
     
     db.commit()
     db.refresh(db_visit)
     
+    event_broker.publish("visit.updated", visit_event_data(db_visit), territory)
+    
     return db_visit
 
 
 @router.delete("/{visit_id}")
-async def delete_visit(visit_id: int, db: Session = Depends(get_db)):
+async def delete_visit(
+    visit_id: int,
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_db)
+):
     """Delete a visit"""
-    db_visit = db.query(Visit).filter(Visit.id == visit_id).first()
+    db_visit = db.query(Visit).filter(
+        Visit.territory == territory,
+        Visit.id == visit_id
+    ).first()
     
     if not db_visit:
         raise HTTPException(status_code=404, detail="Visit not found")
     
+    customer_id = db_visit.customer_id
+    customer = db.query(Customer).filter(Customer.id == customer_id).with_for_update().one()
+    record_visit_change(db, visit_contribution(db_visit, customer), None)
     db.delete(db_visit)
+    db.add(Tombstone(territory=territory, entity_type="visit", entity_id=visit_id))
+    if customer.latest_visit_id == visit_id:
+        db.flush()
+        refresh_latest_visit(db, customer, active_cycle_start(db, territory))
     db.commit()
     
+    event_broker.publish("visit.deleted", {"id": visit_id, "customer_id": customer_id}, territory)
+    
     return {"message": "Visit deleted successfully"}
 
 
 @router.get("/stats/dashboard", response_model=DashboardStats)
-async def get_dashboard_stats(db: Session = Depends(get_db)):
-    """Get dashboard statistics"""
+async def get_dashboard_stats(
+    include_history: bool = Query(False, description="Count visits from closed route cycles too"),
+    territory: str = Depends(get_territory),
+    db: Session = Depends(get_read_db)
+):
+    """Get dashboard statistics for the active route cycle"""
+    cycle_start = active_cycle_start(db, territory)
+    hot_visits = visits_since_filter(territory, None if include_history else cycle_start)
+    customers = db.query(Customer).filter(Customer.territory == territory)
+    visits = db.query(Visit).filter(*hot_visits)
     
     # Total customers
-    total_customers = db.query(Customer).count()
+    total_customers = customers.count()
     
     # Visited count (any status except not_visited)
-    visited_count = db.query(Visit).filter(
+    visited_count = visits.filter(
         Visit.status != "not_visited"
     ).count()
     
     # Sales made count
-    sales_made_count = db.query(Visit).filter(
+    sales_made_count = visits.filter(
         Visit.status == "sale_made"
     ).count()
     
     # Total sales amount
-    total_sales = db.query(func.sum(Visit.sales_amount)).scalar() or 0.0
+    total_sales = db.query(func.sum(Visit.sales_amount)).filter(
+        *hot_visits
+    ).scalar() or 0.0
     
     # Follow-ups required
-    follow_ups_required = db.query(Visit).filter(
+    follow_ups_required = visits.filter(
         Visit.follow_up_required == True
     ).count()
     
-    # Week progress (percentage of customers visited per week)
+    # Week progress (percentage of customers visited per week in the active cycle),
+    # read from the customers' latest-visit columns in one grouped scan
+    week_counts = {
+        week_num: (week_customers, week_visited or 0)
+        for week_num, week_customers, week_visited in db.query(
+            Customer.week_number,
+            func.count(Customer.id),
+            func.sum(case(
+                (and_(Customer.latest_status != "not_visited", latest_visit_in_cycle(cycle_start)), 1),
+                else_=0
+            ))
+        ).filter(Customer.territory == territory).group_by(Customer.week_number)
+    }
+    
     def calculate_week_progress(week_num):
-        week_customers = db.query(Customer).filter(
-            Customer.week_number == week_num
-        ).count()
+        week_customers, week_visited = week_counts.get(week_num, (0, 0))
         
         if week_customers == 0:
             return 0.0
         
-        week_visited = db.query(Visit).join(Customer).filter(
-            Customer.week_number == week_num,
-            Visit.status != "not_visited"
-        ).count()
-        
         return (week_visited / week_customers) * 100
     
     return DashboardStats(
@@ -1,11 +1,15 @@
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from typing import Optional
-from datetime import datetime
 
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    # Optional read replica for read-only endpoints; a territory's reads stay on
+    # the primary for REPLICA_STICKY_SECONDS after it writes
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_STICKY_SECONDS: float = 5
     
     # Microsoft Graph API
     MICROSOFT_CLIENT_ID: str
@@ -27,6 +31,56 @@ class Settings(BaseSettings):
     CORS_ORIGINS: list = ["http://localhost:5173", "http://localhost:5174", "http://localhost:3000"]
     FRONTEND_URL: str = "http://localhost:5173"
     
+    # Multi-tenancy: rows belong to a rep/territory. REP_TERRITORIES maps a
+    # Microsoft account (object id or username) to its territory or territories,
+    # granted in the access token; X-Territory or ?territory= picks among them.
+    # Left empty, everyone (signed in or not) uses DEFAULT_TERRITORY.
+    DEFAULT_TERRITORY: str = "default"
+    REP_TERRITORIES: dict = {}
+    
+    # The change feed cursor trails now by this much, so rows committed late by
+    # slow requests or jobs (stamped before they became visible) are not skipped
+    CHANGE_FEED_LAG_SECONDS: float = 60
+    
+    # Offline geocode table (CSV: account_number/address, latitude, longitude)
+    GEOCODE_TABLE_PATH: Optional[str] = None
+    
+    # In-process LRU cache of route-day customer lists
+    ROUTE_CACHE_SIZE: int = 256
+    ROUTE_CACHE_TTL_SECONDS: float = 300
+    ROUTE_TIMEZONE: str = "UTC"  # Decides which date /routes/today serves
+    
+    # Background sync jobs
+    JOB_WORKERS: int = 2
+    JOB_TTL_SECONDS: int = 3600
+    # Parse/generate stages running at once, and pending import/export jobs
+    # allowed before new ones are rejected with 429
+    SYNC_CPU_SLOTS: int = 2
+    SYNC_MAX_PENDING: int = 8
+    
+    # Logging: JSON lines (or "text") written by a background thread
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_FILE: Optional[str] = None
+    LOG_SAMPLE_RATE: float = 1.0  # Share of DEBUG/INFO records kept; warnings and errors always are
+    
+    # SQL profiling: Server-Timing headers and N+1 warnings per request (opt-in);
+    # statements slower than SQL_SLOW_QUERY_MS are always logged
+    SQL_PROFILING: bool = False
+    SQL_SLOW_QUERY_MS: float = 200
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10
+    
+    # Change events (optional Redis pub/sub shared by all workers)
+    EVENTS_REDIS_URL: Optional[str] = None
+    
+    @field_validator("SECRET_KEY")
+    @classmethod
+    def require_secret_key(cls, value: str) -> str:
+        # Signs the access tokens that grant territories: refuse to start without one
+        if not value.strip():
+            raise ValueError("SECRET_KEY must be set")
+        return value
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -34,11 +88,3 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
-with open("debug_startup.log", "a") as f:
-    f.write(f"\n--- {datetime.now()} ---\n")
-    f.write(f"DEBUG: Loaded SECRET_KEY starting with: {settings.SECRET_KEY[:8]}\n")
-    f.write(f"DEBUG: Using ALGORITHM: {settings.ALGORITHM}\n")
-    f.write(f"DEBUG: FRONTEND_URL: {settings.FRONTEND_URL}\n")
-print(f"DEBUG: Loaded SECRET_KEY starting with: {settings.SECRET_KEY[:8]}")
-print(f"DEBUG: Using ALGORITHM: {settings.ALGORITHM}")
-print(f"DEBUG: FRONTEND_URL: {settings.FRONTEND_URL}")
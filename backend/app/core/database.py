@@ -1,13 +1,71 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from itertools import chain
+from fastapi import Depends
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.profiling import install_query_profiler
+from app.core.tenancy import get_territory
 
 engine = create_engine(settings.DATABASE_URL)
+install_query_profiler(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replica for read-only endpoints
+replica_engine = None
+ReplicaSessionLocal = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(settings.DATABASE_REPLICA_URL)
+    install_query_profiler(replica_engine)
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
 Base = declarative_base()
 
+# Read-your-writes: territory -> monotonic time of its last commit on the primary.
+# Kept per worker process.
+_last_writes = {}
+_last_writes_lock = threading.Lock()
+
+
+def record_write(territory: str):
+    """Send the territory's reads to the primary for the next REPLICA_STICKY_SECONDS"""
+    with _last_writes_lock:
+        _last_writes[territory] = time.monotonic()
+
+
+def use_replica(territory: str) -> bool:
+    if ReplicaSessionLocal is None:
+        return False
+    with _last_writes_lock:
+        last_write = _last_writes.get(territory)
+    return last_write is None or time.monotonic() - last_write > settings.REPLICA_STICKY_SECONDS
+
+
+def read_session_factory(territory: str) -> sessionmaker:
+    """Session factory for read-only work: the replica unless the territory just wrote"""
+    return ReplicaSessionLocal if use_replica(territory) else SessionLocal
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_written_territories(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        territory = getattr(obj, "territory", None)
+        if territory:
+            session.info.setdefault("written_territories", set()).add(territory)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_written_territories(session):
+    for territory in session.info.pop("written_territories", ()):
+        record_write(territory)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _discard_written_territories(session, previous_transaction):
+    session.info.pop("written_territories", None)
+
 
 def get_db():
     db = SessionLocal()
@@ -17,6 +75,15 @@ def get_db():
         db.close()
 
 
+def get_read_db(territory: str = Depends(get_territory)):
+    """Session for read-only endpoints, served by the read replica when configured"""
+    db = read_session_factory(territory)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
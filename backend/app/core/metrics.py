@@ -0,0 +1,155 @@
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+# HTTP
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["method"],
+)
+
+# Microsoft Graph API
+GRAPH_LATENCY = Histogram(
+    "graph_api_request_duration_seconds",
+    "Microsoft Graph API call latency",
+    ["operation"],
+)
+GRAPH_ERRORS = Counter(
+    "graph_api_errors_total",
+    "Failed Microsoft Graph API calls",
+    ["operation"],
+)
+
+# Sync imports/exports
+SYNC_STAGE_DURATION = Histogram(
+    "sync_stage_duration_seconds",
+    "Duration of each sync job stage",
+    ["job", "stage", "outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+SYNC_ROWS = Counter(
+    "sync_rows_total",
+    "Rows imported or exported by sync jobs",
+    ["job"],
+)
+
+SYNC_WAIT_DURATION = Histogram(
+    "sync_wait_duration_seconds",
+    "Time sync jobs waited for a CPU slot or a dataset lock",
+    ["resource"],
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+SYNC_WAITING = Gauge(
+    "sync_waiting",
+    "Sync jobs currently waiting for a CPU slot or a dataset lock",
+    ["resource"],
+)
+SYNC_REJECTED = Counter(
+    "sync_rejected_total",
+    "Sync requests rejected with 429 because too many jobs were pending",
+    ["job"],
+)
+
+# Route-day response cache
+ROUTE_CACHE_REQUESTS = Counter(
+    "route_cache_requests_total",
+    "Route-day cache lookups",
+    ["result"],
+)
+ROUTE_CACHE_EVICTIONS = Counter(
+    "route_cache_evictions_total",
+    "Route-day cache entries evicted by the LRU size bound",
+)
+
+# Streaming and scrape endpoints would only skew the latency histogram
+EXCLUDED_PATHS = {"/metrics", "/events/"}
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency per route template and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            # Label by template ("/visits/{visit_id}") to keep cardinality bounded
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.labels(method, template, str(status["code"])).observe(time.perf_counter() - start)
+
+
+class DatabasePoolCollector:
+    """Exports SQLAlchemy connection pool stats at scrape time"""
+
+    def __init__(self):
+        self.engines = {}  # database label -> engine
+
+    def collect(self):
+        stats = {
+            "size": "Configured pool size",
+            "checkedin": "Idle connections in the pool",
+            "checkedout": "Connections in use",
+            "overflow": "Connections opened beyond the pool size",
+        }
+        for name, documentation in stats.items():
+            family = GaugeMetricFamily(f"db_pool_{name}", documentation, labels=["database"])
+            for database, engine in self.engines.items():
+                method = getattr(engine.pool, name, None)
+                if method is not None:
+                    family.add_metric([database], float(method()))
+            yield family
+
+
+_pool_collector = None
+
+
+def register_database_pool(engine, name: str = "primary"):
+    """Idempotent, since the application lifespan may run more than once per process"""
+    global _pool_collector
+    if _pool_collector is None:
+        _pool_collector = DatabasePoolCollector()
+        REGISTRY.register(_pool_collector)
+    _pool_collector.engines[name] = engine
+
+
+@contextmanager
+def track_graph_call(operation: str):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        GRAPH_ERRORS.labels(operation).inc()
+        raise
+    finally:
+        GRAPH_LATENCY.labels(operation).observe(time.perf_counter() - start)
+
+
+def render_metrics():
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,145 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+WHITESPACE = re.compile(r"\s+")
+# "IN (?, ?, ?)" and "IN (__[POSTCOMPILE_ids])" lists vary with the number of ids
+IN_LIST = re.compile(r"\bIN\s*\((?:[^()]*)\)", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with variable-length IN lists collapsed"""
+    return IN_LIST.sub("IN (...)", WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryProfile:
+    """Queries issued while handling one request (or one assert_max_queries block)"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.shapes = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int):
+        """Statement shapes executed at least threshold times, most frequent first"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+# Process-wide captures used by capture_queries/assert_max_queries; TestClient serves requests on
+# another thread, so a context variable set by the test would not be seen there
+_captures = []
+_captures_lock = threading.Lock()
+
+
+def install_query_profiler(engine):
+    """Time every statement on the engine and attribute it to the active profile"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start"].pop()
+
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record(statement, duration)
+        if _captures:
+            with _captures_lock:
+                for capture in _captures:
+                    capture.record(statement, duration)
+
+        if duration * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            logger.warning(
+                "Slow query (%.1f ms)%s: %s",
+                duration * 1000,
+                f" in {profile.label}" if profile and profile.label else "",
+                statement_shape(statement),
+            )
+
+
+@contextmanager
+def profile_queries(label: str = ""):
+    """Collect the queries issued by the current task/thread inside the block"""
+    profile = QueryProfile(label)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+class QueryProfilerMiddleware:
+    """ASGI middleware adding a Server-Timing header and logging likely N+1 patterns"""
+
+    def __init__(self, app, threshold: int = None):
+        self.app = app
+        self.threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries(f"{scope['method']} {scope['path']}") as profile:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", profile.server_timing().encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        for shape, n in profile.repeated(self.threshold):
+            logger.warning("Possible N+1 in %s: %d executions of %s", profile.label, n, shape)
+
+
+@contextmanager
+def capture_queries(label: str = ""):
+    """Collect every query issued on any thread inside the block"""
+    profile = QueryProfile(label)
+    with _captures_lock:
+        _captures.append(profile)
+    try:
+        yield profile
+    finally:
+        with _captures_lock:
+            _captures.remove(profile)
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = ""):
+    """Fail if the block issues more than limit queries, e.g.
+
+        with assert_max_queries(5):
+            client.get("/customers/")
+    """
+    with capture_queries(label) as profile:
+        yield profile
+
+    if profile.count > limit:
+        repeated = "".join(f"\n  {n}x {shape}" for shape, n in profile.repeated(2))
+        raise AssertionError(
+            f"{label or 'block'} issued {profile.count} queries (max {limit}){repeated}"
+        )
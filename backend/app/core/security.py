@@ -3,6 +3,9 @@ from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -25,29 +28,20 @@ def get_session(session_id: str) -> Optional[dict]:
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    TEST_KEY = "testsecret"
-    import hashlib
-    key_hash = hashlib.md5(TEST_KEY.encode()).hexdigest()
-    print(f"DEBUG: Encoding with Key Hash: {key_hash}")
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, TEST_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
 def decode_access_token(token: str):
     try:
-        TEST_KEY = "testsecret"
-        import hashlib
-        key_hash = hashlib.md5(TEST_KEY.encode()).hexdigest()
-        print(f"DEBUG: Decoding with Key Hash: {key_hash}")
-        print(f"DEBUG: Token='{token}'")
-        payload = jwt.decode(token, TEST_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError as e:
-        print(f"JWT DECODE ERROR: {str(e)}")
+        logger.warning("JWT decode failed: %s", e)
         return None
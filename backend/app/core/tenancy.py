@@ -0,0 +1,76 @@
+import re
+from fastapi import Header, HTTPException, Query
+from typing import List, Optional
+from app.core.config import settings
+from app.core.security import decode_access_token
+
+TERRITORY_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+def validate_territory(territory: str) -> str:
+    if not TERRITORY_PATTERN.match(territory):
+        raise ValueError(f"Invalid territory: {territory!r}")
+    return territory
+
+
+def territories_for_user(claims: dict) -> List[str]:
+    """Territories a signed-in Microsoft account may use, stored in its access token.
+    
+    REP_TERRITORIES maps an account's object id or username to a territory or a
+    list of them. Without any assignments every account gets DEFAULT_TERRITORY.
+    """
+    if not settings.REP_TERRITORIES:
+        return [settings.DEFAULT_TERRITORY]
+    
+    assignments = {str(key).lower(): value for key, value in settings.REP_TERRITORIES.items()}
+    for key in (claims.get("oid"), claims.get("preferred_username")):
+        if key and key.lower() in assignments:
+            value = assignments[key.lower()]
+            return [value] if isinstance(value, str) else list(value)
+    return []
+
+
+def allowed_territories(token: Optional[str]) -> List[str]:
+    if not token:
+        # Single-rep deployments (no assignments) keep working without signing in
+        if settings.REP_TERRITORIES:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        return [settings.DEFAULT_TERRITORY]
+    
+    payload = decode_access_token(token)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    territories = payload.get("territories")
+    # Tokens issued before territories were assigned only cover the default
+    return [settings.DEFAULT_TERRITORY] if territories is None else territories
+
+
+def get_territory(
+    authorization: Optional[str] = Header(None),
+    x_territory: Optional[str] = Header(None),
+    territory: Optional[str] = Query(None, description="Rep/territory (defaults to X-Territory header)"),
+    access_token: Optional[str] = Query(None, description="Bearer token for clients that cannot send headers (EventSource)")
+) -> str:
+    """Resolve the tenant for the request from the caller's access token.
+    
+    The X-Territory header or ?territory= parameter only chooses among the
+    territories the token grants; anything else is refused with 403.
+    """
+    token = access_token
+    if authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    allowed = allowed_territories(token)
+    
+    value = territory or x_territory
+    if value is None:
+        if not allowed:
+            raise HTTPException(status_code=403, detail="No territory assigned to this account")
+        return allowed[0]
+    
+    try:
+        validate_territory(value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if value not in allowed:
+        raise HTTPException(status_code=403, detail=f"Territory {value!r} is not assigned to this account")
+    return value
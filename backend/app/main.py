@@ -1,14 +1,42 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import init_db
-from app.api import auth, customers, visits, sync
+from app.core.database import init_db, engine, replica_engine
+from app.core.metrics import MetricsMiddleware, register_database_pool, render_metrics
+from app.core.profiling import QueryProfilerMiddleware
+from app.core.log import RequestLoggingMiddleware, configure_logging, shutdown_logging
+from app.api import auth, customers, visits, sync, changes, events, routes, follow_ups, analytics
+from app.services.events import event_broker
+from app.services.export_cache import export_cache
+from app.services.jobs import job_manager
+from app.services.onedrive import OneDriveService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build services on startup and release them on shutdown"""
+    configure_logging()
+    # Database tables are already created in Supabase
+    # init_db() is skipped for cloud deployment
+    app.state.onedrive = OneDriveService()
+    register_database_pool(engine)
+    if replica_engine is not None:
+        register_database_pool(replica_engine, "replica")
+    await event_broker.start()
+    yield
+    await event_broker.stop()
+    job_manager.shutdown()
+    export_cache.clear()
+    shutdown_logging()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Sales Route Tracker API",
     description="API for tracking Kimball Midwest sales routes",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -20,19 +48,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus request metrics
+app.add_middleware(MetricsMiddleware)
+
+# Per-request query counts and N+1 warnings
+if settings.SQL_PROFILING:
+    app.add_middleware(QueryProfilerMiddleware)
+
+# Request ids and access logs; added last so it wraps everything above
+app.add_middleware(RequestLoggingMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(customers.router)
 app.include_router(visits.router)
 app.include_router(sync.router)
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup"""
-    # Database tables are already created in Supabase
-    # init_db() is skipped for cloud deployment
-    pass
+app.include_router(changes.router)
+app.include_router(events.router)
+app.include_router(routes.router)
+app.include_router(follow_ups.router)
+app.include_router(analytics.router)
 
 
 @app.get("/")
@@ -44,6 +79,13 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
@@ -1,15 +1,32 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
+from datetime import datetime
 from app.core.database import Base
+from app.core.config import settings
+from app.models.visit_status import VisitStatusType
 
 
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        Index("ix_customers_territory_route_day", "territory", "week_number", "day_of_week", "stop_number"),
+        # An account appears once per route day in a territory (a plan repeats it across
+        # weeks; reps' plans may share accounts). Includes the partition key, so it
+        # survives LIST partitioning by territory.
+        Index(
+            "ix_customers_territory_account",
+            "territory", "account_number", "week_number", "day_of_week",
+            unique=True
+        ),
+        Index("ix_customers_territory_updated", "territory", "updated_at"),
+        Index("ix_customers_territory_date", "territory", "date", "stop_number"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    territory = Column(String, nullable=False, default=settings.DEFAULT_TERRITORY)  # Rep/territory owning the row
     name = Column(String, nullable=False)
     address = Column(String)
-    account_number = Column(String, unique=True, index=True)
+    account_number = Column(String)
     
     # Week and day information
     week_number = Column(Integer)  # 1-4
@@ -19,8 +36,39 @@ class Customer(Base):
     location = Column(String)  # MCKINLEYVILLE, ARCATA, etc.
     stop_number = Column(Integer)  # 1-10
     
+    # Coordinates (from the workbook or the offline geocode table)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    
+    # Latest visit in the active cycle, maintained by the visit write paths
+    # (see services/latest_visits.py). Not a foreign key: visits get archived.
+    latest_visit_id = Column(Integer)
+    latest_status = Column(VisitStatusType)
+    latest_visited_at = Column(DateTime)
+    
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
     # Visit tracking relationships
     visits = relationship("Visit", back_populates="customer", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Customer(name={self.name}, account={self.account_number})>"
+
+
+# Trigram indexes for fuzzy search (Postgres only); existing databases get
+# them from create_search_indexes.py
+SEARCH_EXTENSION_STATEMENT = "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+SEARCH_INDEX_STATEMENTS = [
+    f"CREATE INDEX IF NOT EXISTS ix_customers_{column}_trgm ON customers USING gin ({column} gin_trgm_ops)"
+    for column in ("name", "address", "account_number")
+]
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL(SEARCH_EXTENSION_STATEMENT).execute_if(dialect="postgresql")
+)
+for _statement in SEARCH_INDEX_STATEMENTS:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, Index
+from datetime import datetime
+from app.core.database import Base
+from app.models.visit_status import VisitStatusType
+
+
+class SalesRollup(Base):
+    """Visit counts and sales per day x location x week x day of week x status.
+    
+    Maintained incrementally by visit writes (app.services.analytics) and
+    rebuilt by refresh_analytics.py. Missing dimensions are stored as "" / 0
+    (not_visited for status) so the unique key also matches them.
+    """
+    __tablename__ = "sales_rollups"
+    __table_args__ = (
+        Index(
+            "ux_sales_rollups_key",
+            "territory", "day", "location", "week_number", "day_of_week", "status",
+            unique=True
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    territory = Column(String, nullable=False)
+    day = Column(Date, nullable=False)  # Visited (or created) date
+    location = Column(String, nullable=False, default="")
+    week_number = Column(Integer, nullable=False, default=0)
+    day_of_week = Column(String, nullable=False, default="")
+    status = Column(VisitStatusType, nullable=False, default="not_visited")
+    
+    visits = Column(Integer, nullable=False, default=0)
+    sales_amount = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SalesRollup(day={self.day}, location={self.location}, status={self.status})>"
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from datetime import datetime
+from app.core.database import Base
+from app.core.config import settings
+
+
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_territory_deleted", "territory", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    territory = Column(String, nullable=False, default=settings.DEFAULT_TERRITORY)
+    entity_type = Column(String, nullable=False)  # "customer", "visit" or "all" for a full reset
+    entity_id = Column(Integer)  # Null for "all"
+    deleted_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<Tombstone(entity_type={self.entity_type}, entity_id={self.entity_id})>"
@@ -1,18 +1,34 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Boolean, Index, CheckConstraint, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
+from app.core.config import settings
+from app.models.visit_status import VisitStatusType, status_check
 
 
 class Visit(Base):
     __tablename__ = "visits"
+    __table_args__ = (
+        Index("ix_visits_territory_customer", "territory", "customer_id"),
+        Index("ix_visits_territory_updated", "territory", "updated_at"),
+        Index("ix_visits_territory_status", "territory", "status"),
+        CheckConstraint(status_check(), name="ck_visits_status"),
+        # Partial index: only open follow-ups, so the work queue ignores visit history
+        Index(
+            "ix_visits_territory_follow_up", "territory", "follow_up_date", "id",
+            postgresql_where=text("follow_up_required"),
+            sqlite_where=text("follow_up_required = 1")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
+    territory = Column(String, nullable=False, default=settings.DEFAULT_TERRITORY)  # Copied from the customer
     
     # Visit status
-    status = Column(String, default="not_visited")  
-    # Options: not_visited, no_contact, contact_made, sale_made, follow_up_required
+    status = Column(VisitStatusType, nullable=False, default="not_visited")
+    # Options (stored as codes, see visit_status.py): not_visited, no_contact,
+    # contact_made, sale_made, follow_up_required
     
     # Visit details
     visited_at = Column(DateTime)
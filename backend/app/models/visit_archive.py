@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Boolean, Index
+from datetime import datetime
+from app.core.database import Base
+from app.models.visit_status import VisitStatusType
+
+
+class VisitArchive(Base):
+    """Visits from closed route cycles, moved out of the hot visits table.
+    
+    Rows keep the customer's account number and route slot because the
+    customer itself may be gone after a later route plan import, and a plan
+    lists an account on more than one route day.
+    """
+    __tablename__ = "visits_archive"
+    __table_args__ = (
+        Index("ix_visits_archive_territory_created", "territory", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True)  # Original visit id
+    territory = Column(String, nullable=False)
+    customer_id = Column(Integer)
+    account_number = Column(String)
+    location = Column(String)
+    week_number = Column(Integer)
+    day_of_week = Column(String)
+    
+    status = Column(VisitStatusType)
+    visited_at = Column(DateTime)
+    notes = Column(Text)
+    sales_amount = Column(Float)
+    follow_up_required = Column(Boolean)
+    follow_up_date = Column(DateTime)
+    follow_up_notes = Column(Text)
+    
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<VisitArchive(customer_id={self.customer_id}, status={self.status})>"
@@ -0,0 +1,65 @@
+from sqlalchemy import Column, SmallInteger, String, event, insert, select
+from sqlalchemy.types import TypeDecorator
+from app.core.database import Base
+
+# Visit statuses by stored code. Codes are persisted: only ever append.
+VISIT_STATUSES = ("not_visited", "no_contact", "contact_made", "sale_made", "follow_up_required")
+STATUS_CODES = {name: code for code, name in enumerate(VISIT_STATUSES)}
+
+
+class VisitStatusType(TypeDecorator):
+    """Visit status stored as a small-int code, exposed as its name.
+    
+    Comparisons such as Visit.status == "sale_made" bind the code, and unknown
+    names or codes are rejected before they reach the database.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return value
+        if isinstance(value, int) and not isinstance(value, bool):
+            if 0 <= value < len(VISIT_STATUSES):
+                return value
+            raise ValueError(f"Invalid visit status code: {value!r}")
+        try:
+            return STATUS_CODES[value]
+        except (KeyError, TypeError):
+            raise ValueError(f"Invalid visit status: {value!r}") from None
+
+    def process_literal_param(self, value, dialect):
+        return str(self.process_bind_param(value, dialect))
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else VISIT_STATUSES[int(value)]
+
+
+class VisitStatus(Base):
+    """Lookup table naming the status codes, for SQL clients and reports"""
+    __tablename__ = "visit_statuses"
+
+    code = Column(SmallInteger, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<VisitStatus(code={self.code}, name={self.name})>"
+
+
+def status_check(column: str = "status") -> str:
+    """CHECK constraint text allowing only known status codes"""
+    return f"{column} IN ({', '.join(str(code) for code in range(len(VISIT_STATUSES)))})"
+
+
+def seed_visit_statuses(connection):
+    """Insert any status missing from the lookup table"""
+    table = VisitStatus.__table__
+    existing = set(connection.execute(select(table.c.code)).scalars())
+    missing = [{"code": code, "name": name} for code, name in enumerate(VISIT_STATUSES) if code not in existing]
+    if missing:
+        connection.execute(insert(table), missing)
+
+
+@event.listens_for(VisitStatus.__table__, "after_create")
+def _seed_visit_statuses(target, connection, **kw):
+    seed_visit_statuses(connection)
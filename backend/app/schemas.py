@@ -1,6 +1,9 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from typing import Optional, List, Any, Dict, Literal
 from datetime import datetime, date
+from app.models.visit_status import VISIT_STATUSES
+
+VisitStatusName = Literal[VISIT_STATUSES]
 
 
 # Customer Schemas
@@ -14,6 +17,8 @@ class CustomerBase(BaseModel):
     date: date
     location: str
     stop_number: int
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 
 class CustomerCreate(CustomerBase):
@@ -22,13 +27,18 @@ class CustomerCreate(CustomerBase):
 
 class Customer(CustomerBase):
     id: int
+    territory: str
     
     model_config = ConfigDict(from_attributes=True)
 
 
+class CustomerSearchResult(Customer):
+    score: float
+
+
 # Visit Schemas
 class VisitBase(BaseModel):
-    status: str = "not_visited"
+    status: VisitStatusName = "not_visited"
     notes: Optional[str] = None
     sales_amount: Optional[float] = 0.0
     follow_up_required: bool = False
@@ -41,7 +51,7 @@ class VisitCreate(VisitBase):
 
 
 class VisitUpdate(BaseModel):
-    status: Optional[str] = None
+    status: Optional[VisitStatusName] = None
     notes: Optional[str] = None
     sales_amount: Optional[float] = None
     follow_up_required: Optional[bool] = None
@@ -53,6 +63,7 @@ class VisitUpdate(BaseModel):
 class Visit(VisitBase):
     id: int
     customer_id: int
+    territory: str
     visited_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
@@ -60,11 +71,45 @@ class Visit(VisitBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Visit moved to the archive; archived rows may predate required columns
+class ArchivedVisit(BaseModel):
+    id: int
+    customer_id: Optional[int] = None
+    territory: str
+    account_number: Optional[str] = None
+    location: Optional[str] = None
+    week_number: Optional[int] = None
+    day_of_week: Optional[str] = None
+    status: Optional[str] = None
+    visited_at: Optional[datetime] = None
+    notes: Optional[str] = None
+    sales_amount: Optional[float] = None
+    follow_up_required: Optional[bool] = None
+    follow_up_date: Optional[datetime] = None
+    follow_up_notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None
+    archived: bool = True
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
 # Customer with Visit
 class CustomerWithVisit(Customer):
     visits: List[Visit] = []
 
 
+# Follow-up Work Queue
+class FollowUp(Visit):
+    customer: Customer
+
+
+class FollowUpPage(BaseModel):
+    items: List[FollowUp] = []
+    next_cursor: Optional[str] = None  # Pass as ?after= for the next page
+
+
 # Dashboard Stats
 class DashboardStats(BaseModel):
     total_customers: int
@@ -78,9 +123,101 @@ class DashboardStats(BaseModel):
     week_4_progress: float
 
 
+# Daily Route
+class RouteStop(Customer):
+    latest_status: Optional[str] = None
+    latest_visited_at: Optional[datetime] = None
+
+
+class NearbyCustomer(RouteStop):
+    distance_km: float
+
+
+class DailyRoute(BaseModel):
+    date: date
+    plan_date: Optional[date] = None  # Matching date in the route plan's first cycle
+    week_number: Optional[int] = None
+    day_of_week: Optional[str] = None
+    stops: List[RouteStop] = []
+
+
+# Sales Analytics
+class SalesRow(BaseModel):
+    period: Optional[date] = None  # Start of the day/week/month; None for interval=total
+    location: Optional[str] = None
+    week_number: Optional[int] = None
+    day_of_week: Optional[str] = None
+    status: Optional[str] = None
+    visits: int
+    sales_amount: float
+
+
+class SalesAnalytics(BaseModel):
+    interval: str
+    group_by: List[str] = []
+    rows: List[SalesRow] = []
+
+
+# Route Optimization
+class RouteStopProposal(BaseModel):
+    customer_id: int
+    name: str
+    current_stop: int
+    proposed_stop: int
+
+
+class RouteDayProposal(BaseModel):
+    week_number: int
+    day_of_week: str
+    current_distance_km: float
+    proposed_distance_km: float
+    stops_without_coordinates: int = 0
+    stops: List[RouteStopProposal] = []
+
+
+# Change Feed
+class Tombstone(BaseModel):
+    entity_type: str
+    entity_id: Optional[int] = None
+    deleted_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChangeFeed(BaseModel):
+    cursor: Optional[str] = None
+    reset: bool = False  # True when the client must drop its local replica first
+    customers: List[Customer] = []
+    visits: List[Visit] = []
+    deleted: List[Tombstone] = []
+
+
 # Sync Response
 class SyncResponse(BaseModel):
     success: bool
     message: str
     customers_synced: int
     last_sync: datetime
+    cached: bool = False  # Nothing changed since the last export, which was reused
+
+
+# Background Jobs
+class JobStage(BaseModel):
+    name: str
+    status: str
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobStatus(BaseModel):
+    id: str
+    kind: str
+    status: str
+    stage: Optional[str] = None
+    stages: List[JobStage] = []
+    progress: float = 0.0
+    result: Optional[Dict[str, Any]] = None
+    artifact_url: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,195 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, func, insert, literal, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.customer import Customer
+from app.models.sales_rollup import SalesRollup
+from app.models.visit import Visit
+from app.models.visit_archive import VisitArchive
+from app.models.visit_status import VisitStatusType
+
+# Rollup dimensions that can be grouped by, besides the time period
+DIMENSIONS = ("location", "week_number", "day_of_week", "status")
+INTERVALS = ("day", "week", "month", "total")
+
+# (territory, day, location, week_number, day_of_week, status)
+RollupKey = Tuple[str, date, str, int, str, str]
+
+
+def visit_contribution(visit: Visit, customer: Customer) -> Optional[Tuple[RollupKey, float]]:
+    """The rollup row a visit counts towards, and its sales amount"""
+    when = visit.visited_at or visit.created_at
+    if when is None:
+        return None
+    key = (
+        visit.territory,
+        when.date(),
+        customer.location or "",
+        customer.week_number or 0,
+        customer.day_of_week or "",
+        visit.status or "not_visited",
+    )
+    return key, visit.sales_amount or 0.0
+
+
+def add_to_rollup(db: Session, key: RollupKey, visits: int, sales_amount: float):
+    """Atomically add to one rollup row, creating it if needed (uncommitted)"""
+    columns = dict(zip(("territory", "day", "location", "week_number", "day_of_week", "status"), key))
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(SalesRollup).values(
+        **columns, visits=visits, sales_amount=sales_amount, updated_at=datetime.utcnow()
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=list(columns),
+        set_={
+            "visits": SalesRollup.visits + statement.excluded.visits,
+            "sales_amount": SalesRollup.sales_amount + statement.excluded.sales_amount,
+            "updated_at": statement.excluded.updated_at,
+        }
+    ))
+
+
+def record_visit_change(db: Session, before, after):
+    """Move a visit's contribution in the rollup (uncommitted).
+    
+    before/after are visit_contribution() results captured around the write,
+    None for a created or deleted visit.
+    """
+    if before == after:
+        return
+    if before is not None:
+        add_to_rollup(db, before[0], -1, -before[1])
+    if after is not None:
+        add_to_rollup(db, after[0], 1, after[1])
+
+
+def rebuild_sales_rollups(db: Session, territory: Optional[str] = None, since: Optional[date] = None) -> int:
+    """Recompute rollup rows from visits and the visit archive (uncommitted).
+    
+    For data written outside the API (bulk loads, SQL fixes) and as a scheduled
+    repair. Archived visits use the route slot stored when they were archived;
+    rows archived before it was stored fall back to the account's first
+    customer in the current route plan, or "" if it has left the plan.
+    Returns the number of rollup rows written.
+    """
+    def source(model, customer, join_on, location, week_number, day_of_week):
+        when = func.coalesce(model.visited_at, model.created_at)
+        query = select(
+            model.territory.label("territory"),
+            func.date(when, type_=SalesRollup.day.type).label("day"),
+            func.coalesce(*location, "").label("location"),
+            func.coalesce(*week_number, 0).label("week_number"),
+            func.coalesce(*day_of_week, "").label("day_of_week"),
+            func.coalesce(model.status, literal("not_visited", VisitStatusType())).label("status"),
+            func.coalesce(model.sales_amount, 0.0).label("sales_amount"),
+        ).select_from(model).outerjoin(customer, join_on).where(when.is_not(None))
+        if territory:
+            query = query.where(model.territory == territory)
+        if since:
+            query = query.where(when >= datetime.combine(since, datetime.min.time()))
+        return query
+
+    # One customer per account: a plan repeats accounts across route days, and
+    # joining every match would count an archived visit once per day listed
+    first_customer = select(func.min(Customer.id).label("id")).group_by(
+        Customer.territory, Customer.account_number
+    ).subquery()
+    account_customer = select(
+        Customer.territory, Customer.account_number, Customer.location,
+        Customer.week_number, Customer.day_of_week
+    ).join(first_customer, first_customer.c.id == Customer.id).subquery()
+
+    visits = union_all(
+        source(
+            Visit, Customer, Customer.id == Visit.customer_id,
+            [Customer.location], [Customer.week_number], [Customer.day_of_week]
+        ),
+        source(
+            VisitArchive, account_customer, and_(
+                account_customer.c.territory == VisitArchive.territory,
+                account_customer.c.account_number == VisitArchive.account_number
+            ),
+            [VisitArchive.location, account_customer.c.location],
+            [VisitArchive.week_number, account_customer.c.week_number],
+            [VisitArchive.day_of_week, account_customer.c.day_of_week]
+        ),
+    ).subquery()
+
+    keys = [visits.c.territory, visits.c.day, visits.c.location, visits.c.week_number,
+            visits.c.day_of_week, visits.c.status]
+    rows = select(
+        *keys,
+        func.count().label("visits"),
+        func.sum(visits.c.sales_amount).label("sales_amount"),
+        literal(datetime.utcnow()).label("updated_at")
+    ).group_by(*keys)
+
+    stale = db.query(SalesRollup)
+    if territory:
+        stale = stale.filter(SalesRollup.territory == territory)
+    if since:
+        stale = stale.filter(SalesRollup.day >= since)
+    stale.delete(synchronize_session=False)
+
+    result = db.execute(insert(SalesRollup).from_select(
+        ["territory", "day", "location", "week_number", "day_of_week", "status",
+         "visits", "sales_amount", "updated_at"],
+        rows
+    ))
+    return result.rowcount
+
+
+def period_start(day: date, interval: str) -> Optional[date]:
+    if interval == "day":
+        return day
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return None
+
+
+def sales_summary(
+    db: Session,
+    territory: str,
+    group_by: Sequence[str] = (),
+    interval: str = "total",
+    start: Optional[date] = None,
+    end: Optional[date] = None
+) -> List[Dict]:
+    """Visits and sales from the rollup, grouped by period and dimensions"""
+    dimensions = [getattr(SalesRollup, name) for name in group_by]
+    query = db.query(
+        SalesRollup.day,
+        *dimensions,
+        func.sum(SalesRollup.visits),
+        func.sum(SalesRollup.sales_amount)
+    ).filter(SalesRollup.territory == territory)
+
+    if start:
+        query = query.filter(SalesRollup.day >= start)
+    if end:
+        query = query.filter(SalesRollup.day <= end)
+
+    # Rollup rows per day are few; days are folded into weeks/months here so the
+    # bucketing does not depend on the database's date functions
+    totals = defaultdict(lambda: [0, 0.0])
+    for day, *values in query.group_by(SalesRollup.day, *dimensions):
+        *keys, visits, sales_amount = values
+        total = totals[(period_start(day, interval), *keys)]
+        total[0] += visits or 0
+        total[1] += sales_amount or 0.0
+
+    rows = []
+    for (period, *keys), (visits, sales_amount) in sorted(totals.items(), key=lambda item: [str(value) for value in item[0]]):
+        if visits == 0 and not sales_amount:
+            continue  # Only deletions left in this group
+        rows.append({
+            "period": period,
+            **dict(zip(group_by, keys)),
+            "visits": visits,
+            "sales_amount": round(sales_amount, 2),
+        })
+    return rows
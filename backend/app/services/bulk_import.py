@@ -0,0 +1,107 @@
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.core.tenancy import validate_territory
+from app.services.excel_parser import parse_workbook_safe
+from app.services.events import event_broker
+from app.services.route_plan import CustomerBatchWriter, clear_route_plan
+
+WORKBOOK_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+def collect_workbooks(source: str, extract_dir: str) -> List[str]:
+    """List route-plan workbooks in a directory or zip archive"""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            archive.extractall(extract_dir)
+        source = extract_dir
+    
+    if not os.path.isdir(source):
+        raise ValueError(f"Not a directory or zip archive: {source}")
+    
+    workbooks = []
+    for root, _, files in os.walk(source):
+        for name in files:
+            # Skip Excel lock files and macOS resource forks
+            if name.lower().endswith(WORKBOOK_EXTENSIONS) and not name.startswith(("~$", "._")):
+                workbooks.append(os.path.join(root, name))
+    return sorted(workbooks)
+
+
+def workbook_territory(path: str) -> str:
+    """Territory for a rep's workbook, taken from its file name"""
+    return validate_territory(os.path.splitext(os.path.basename(path))[0].replace(" ", "_"))
+
+
+def import_workbooks(
+    db: Session,
+    source: str,
+    territory: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    batch_size: int = 1000
+) -> Dict:
+    """Parse every workbook in a directory/zip in parallel and load them in one transaction.
+    
+    Each workbook replaces the territory named after its file, or all of them
+    go to `territory` when given. Files that fail to parse are reported and
+    skipped; the rest are imported.
+    """
+    with tempfile.TemporaryDirectory() as extract_dir:
+        workbooks = collect_workbooks(source, extract_dir)
+        if not workbooks:
+            raise ValueError(f"No route-plan workbooks found in {source}")
+        
+        max_workers = max_workers or min(len(workbooks), os.cpu_count() or 1)
+        base_dir = os.path.dirname(os.path.commonprefix(workbooks))
+        files = []
+        errors = []
+        writers = {}
+        
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(parse_workbook_safe, path) for path in workbooks]
+                
+                # Stream each workbook's rows into the writer as soon as it is parsed
+                for future in as_completed(futures):
+                    path, customers_data, error = future.result()
+                    name = os.path.relpath(path, base_dir)
+                    if not error:
+                        try:
+                            target = territory or workbook_territory(path)
+                        except ValueError as e:
+                            error = str(e)
+                    if error:
+                        errors.append({"file": name, "error": error})
+                        continue
+                    
+                    # Territories are cleared once, the first time one of their workbooks arrives
+                    if target not in writers:
+                        clear_route_plan(db, target)
+                        writers[target] = CustomerBatchWriter(db, target, batch_size=batch_size)
+                    
+                    writers[target].add_many(customers_data)
+                    files.append({"file": name, "territory": target, "customers": len(customers_data)})
+            
+            if not files:
+                raise ValueError("No workbook could be parsed; existing data was left unchanged")
+            
+            for writer in writers.values():
+                writer.flush()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    
+    for target, writer in writers.items():
+        event_broker.publish("route_plan.imported", {"customers": writer.count}, target)
+    
+    return {
+        "workbooks": len(workbooks),
+        "territories": len(writers),
+        "imported": sorted(files, key=lambda f: f["file"]),
+        "errors": sorted(errors, key=lambda e: e["file"]),
+        "customers_imported": sum(writer.count for writer in writers.values())
+    }
@@ -0,0 +1,119 @@
+from datetime import datetime, date, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+from sqlalchemy import func, select, insert, literal
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.customer import Customer
+from app.models.visit import Visit
+from app.models.visit_archive import VisitArchive
+from app.models.tombstone import Tombstone
+from app.services.latest_visits import repair_latest_visits
+
+CYCLE_DAYS = 28  # A route plan is a repeating 4-week cycle
+
+
+def cycle_start_for(anchor: date, today: Optional[date] = None) -> datetime:
+    """Start of the cycle containing `today` (default: route_today()), for cycles repeating from `anchor`"""
+    today = today or route_today()
+    cycles = (today - anchor).days // CYCLE_DAYS
+    return datetime.combine(anchor + timedelta(days=cycles * CYCLE_DAYS), datetime.min.time())
+
+
+def route_today() -> date:
+    """Today's date where the reps work (ROUTE_TIMEZONE)"""
+    return datetime.now(ZoneInfo(settings.ROUTE_TIMEZONE)).date()
+
+
+def plan_date_for(anchor: date, day: date) -> date:
+    """The route plan date whose stops are worked on `day`"""
+    return anchor + timedelta(days=(day - anchor).days % CYCLE_DAYS)
+
+
+def active_cycle_start(db: Session, territory: str, today: Optional[date] = None) -> Optional[datetime]:
+    """Start of the territory's active route cycle, or None without a route plan"""
+    anchor = db.query(func.min(Customer.date)).filter(Customer.territory == territory).scalar()
+    if anchor is None:
+        return None
+    return cycle_start_for(anchor, today)
+
+
+def latest_visit_subquery(*criteria):
+    """Visits matching criteria ranked newest first per customer; join on rank == 1"""
+    return select(
+        Visit.customer_id,
+        Visit.status,
+        Visit.visited_at,
+        func.row_number().over(
+            partition_by=Visit.customer_id,
+            order_by=(Visit.updated_at.desc(), Visit.id.desc())
+        ).label("rank")
+    ).where(*criteria).subquery()
+
+
+def visits_since_filter(territory: str, cycle_start: Optional[datetime]):
+    """Filter criteria restricting visits to those created since cycle_start (None: all)"""
+    criteria = [Visit.territory == territory]
+    if cycle_start is not None:
+        criteria.append(Visit.created_at >= cycle_start)
+    return criteria
+
+
+def hot_visits_filter(db: Session, territory: str, include_history: bool = False):
+    """Filter criteria restricting visits to the territory's active cycle"""
+    return visits_since_filter(territory, None if include_history else active_cycle_start(db, territory))
+
+
+def move_visits_to_archive(db: Session, *criteria, tombstones: bool = False) -> int:
+    """Copy matching visits into visits_archive and delete them (uncommitted).
+    
+    With tombstones=True the change feed also reports them as deleted.
+    """
+    columns = [
+        "id", "territory", "customer_id", "status", "visited_at", "notes", "sales_amount",
+        "follow_up_required", "follow_up_date", "follow_up_notes", "created_at", "updated_at",
+    ]
+    source = select(
+        *[getattr(Visit, name) for name in columns],
+        Customer.account_number,
+        Customer.location,
+        Customer.week_number,
+        Customer.day_of_week,
+        literal(datetime.utcnow()).label("archived_at")
+    ).join(Customer, Customer.id == Visit.customer_id).where(*criteria)
+    
+    result = db.execute(insert(VisitArchive).from_select(
+        columns + ["account_number", "location", "week_number", "day_of_week", "archived_at"], source
+    ))
+    if not result.rowcount:
+        return 0
+    
+    if tombstones:
+        db.execute(insert(Tombstone).from_select(
+            ["territory", "entity_type", "entity_id", "deleted_at"],
+            select(Visit.territory, literal("visit"), Visit.id, literal(datetime.utcnow())).where(*criteria)
+        ))
+    
+    db.query(Visit).filter(*criteria).delete(synchronize_session=False)
+    return result.rowcount
+
+
+def archive_closed_cycles(db: Session, territory: Optional[str] = None) -> dict:
+    """Move visits from closed route cycles into the archive; returns rows moved per territory"""
+    territories = [territory] if territory else [
+        row[0] for row in db.query(Customer.territory).distinct()
+    ]
+    
+    moved = {}
+    for name in territories:
+        cycle_start = active_cycle_start(db, name)
+        if cycle_start is None:
+            continue
+        moved[name] = move_visits_to_archive(
+            db, Visit.territory == name, Visit.created_at < cycle_start, tombstones=True
+        )
+        # Customers whose latest visit was just archived fall back to this cycle's
+        repair_latest_visits(db, name, cycle_start)
+    
+    db.commit()
+    return moved
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import logging
+import threading
+import uuid
+from datetime import datetime
+from typing import Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Delay before reconnecting to Redis, doubled per failed attempt up to the max
+REDIS_RETRY_SECONDS = 1.0
+REDIS_RETRY_MAX_SECONDS = 30.0
+
+
+class EventBroker:
+    """In-process pub/sub that fans change events out to SSE subscribers.
+    
+    With EVENTS_REDIS_URL set, events are also published to a Redis channel
+    and every worker relays the other workers' events to its own subscribers.
+    Publishing never blocks the caller: messages are queued for a background
+    task on the event loop, which (like the relay) reconnects after failures.
+    """
+    
+    def __init__(self, redis_url: Optional[str] = None, channel: str = "route-tracker-events",
+                 queue_size: int = 100):
+        self.redis_url = redis_url
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers = {}  # queue -> (event loop that owns it, territory)
+        self._listeners = []  # callables run for every event, e.g. cache invalidation
+        self._lock = threading.Lock()
+        self.instance_id = uuid.uuid4().hex  # Tags this worker's messages on the shared channel
+        self._loop = None
+        self._outbox = None  # Messages waiting for the Redis publisher
+        self._tasks = []
+    
+    async def start(self):
+        """Connect to the shared backend (if configured) and relay its events"""
+        if not self.redis_url:
+            return
+        try:
+            import redis.asyncio  # noqa: F401  Optional shared backend for multi-worker deployments
+        except ImportError:
+            raise RuntimeError("EVENTS_REDIS_URL is set but the 'redis' package is not installed")
+        
+        self._loop = asyncio.get_running_loop()
+        self._outbox = asyncio.Queue(maxsize=self.queue_size * 10)
+        self._tasks = [asyncio.create_task(self._publisher()), asyncio.create_task(self._relay())]
+    
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        self._outbox = None
+    
+    async def _with_reconnect(self, name: str, run):
+        """Run run(client, connected) against a fresh Redis client until cancelled.
+        
+        After a failure it reconnects with exponential backoff; run calls
+        connected() once it is working to reset the delay.
+        """
+        import redis.asyncio as aioredis
+        
+        delay = REDIS_RETRY_SECONDS
+        
+        def connected():
+            nonlocal delay
+            delay = REDIS_RETRY_SECONDS
+        
+        while True:
+            client = aioredis.Redis.from_url(self.redis_url)
+            try:
+                await run(client, connected)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Redis event %s failed, retrying in %.0fs: %s", name, delay, e)
+            finally:
+                await client.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, REDIS_RETRY_MAX_SECONDS)
+    
+    async def _publisher(self):
+        pending = None  # Message that failed to send, retried after reconnecting
+        
+        async def run(client, connected):
+            nonlocal pending
+            while True:
+                if pending is None:
+                    pending = await self._outbox.get()
+                await client.publish(self.channel, pending)
+                pending = None
+                connected()
+        
+        await self._with_reconnect("publisher", run)
+    
+    async def _relay(self):
+        async def run(client, connected):
+            pubsub = client.pubsub()
+            await pubsub.subscribe(self.channel)
+            connected()
+            try:
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    envelope = json.loads(message["data"])
+                    if envelope.get("origin") == self.instance_id:
+                        continue  # Already dispatched locally by publish()
+                    data = envelope["event"]
+                    event = json.loads(data)
+                    self._notify_listeners(event)
+                    self._fan_out(data, event.get("territory"))
+            finally:
+                await pubsub.reset()  # Drops the connection without a round trip
+        
+        await self._with_reconnect("relay", run)
+    
+    def subscribe(self, territory: Optional[str] = None) -> asyncio.Queue:
+        """Register a subscriber queue on the running event loop.
+        
+        Subscribers with a territory only receive that territory's events.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[queue] = (asyncio.get_running_loop(), territory)
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+    
+    def add_listener(self, callback):
+        """Call callback(event) synchronously for every event this worker sees.
+        
+        With Redis that includes events published by other workers.
+        """
+        self._listeners.append(callback)
+    
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+    
+    def publish(self, event_type: str, data: dict, territory: Optional[str] = None):
+        """Broadcast an event; safe to call from request handlers and worker threads"""
+        event = {
+            "type": event_type,
+            "territory": territory,
+            "data": data,
+            "at": datetime.utcnow().isoformat()
+        }
+        message = json.dumps(event, default=str)
+        
+        # Local listeners run before publish returns so this worker never serves
+        # state older than its own writes; other workers get it through Redis
+        self._notify_listeners(event)
+        self._fan_out(message, territory)
+        
+        loop = self._loop
+        if loop is not None:
+            envelope = json.dumps({"origin": self.instance_id, "event": message})
+            try:
+                loop.call_soon_threadsafe(self._enqueue, envelope)
+            except RuntimeError:
+                pass  # Loop closed during shutdown
+    
+    def _enqueue(self, envelope: str):
+        # If Redis stays down, drop the oldest messages rather than grow without bound
+        if self._outbox is None:
+            return
+        if self._outbox.full():
+            self._outbox.get_nowait()
+            logger.warning("Redis event outbox full, dropped the oldest event")
+        self._outbox.put_nowait(envelope)
+    
+    def _notify_listeners(self, event: dict):
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Event listener failed", extra={"event_type": event.get("type")})
+    
+    def _fan_out(self, message: str, territory: Optional[str] = None):
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        
+        for queue, (loop, subscribed_territory) in subscribers:
+            if subscribed_territory and territory and subscribed_territory != territory:
+                continue
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, message)
+            except RuntimeError:
+                # Subscriber's loop is closed
+                self.unsubscribe(queue)
+    
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, message: str):
+        # Slow consumers lose their oldest events rather than blocking publishers
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+
+def visit_event_data(visit) -> dict:
+    """Compact payload describing a visit change"""
+    return {
+        "id": visit.id,
+        "customer_id": visit.customer_id,
+        "status": visit.status,
+        "sales_amount": visit.sales_amount,
+        "follow_up_required": visit.follow_up_required,
+        "updated_at": visit.updated_at.isoformat() if visit.updated_at else None,
+    }
+
+
+# Global instance
+event_broker = EventBroker(settings.EVENTS_REDIS_URL)
@@ -1,7 +1,19 @@
-import openpyxl
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import re
+from app.services.route_table import RoutePlanTable
+
+COORDINATES_PATTERN = re.compile(r'(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)')
+
+# Tracking export values for customers without a visit
+NOT_VISITED = {
+    "status": "not_visited",
+    "visited_at": None,
+    "notes": "",
+    "sales_amount": 0.0,
+    "follow_up_required": False,
+    "follow_up_date": None
+}
 
 
 def parse_customer_cell(cell_value: str) -> Dict[str, str]:
@@ -20,10 +32,21 @@ def parse_customer_cell(cell_value: str) -> Dict[str, str]:
     account_match = re.search(r'Acct:\s*(\w+)', lines[2])
     account_number = account_match.group(1) if account_match else ""
     
+    # Optional coordinates line, e.g. "40.9465, -124.1012"
+    latitude, longitude = None, None
+    for line in lines[3:]:
+        coords_match = COORDINATES_PATTERN.search(line)
+        if coords_match:
+            latitude = float(coords_match.group(1))
+            longitude = float(coords_match.group(2))
+            break
+    
     return {
         "name": name,
         "address": address,
-        "account_number": account_number
+        "account_number": account_number,
+        "latitude": latitude,
+        "longitude": longitude
     }
 
 
@@ -46,8 +69,10 @@ def parse_date_from_header(date_str: str) -> datetime:
         return None, None
 
 
-def parse_excel_route_plan(file_path: str) -> List[Dict]:
-    """Parse the entire Excel route plan and return structured data"""
+def parse_excel_route_plan(file_path: str) -> RoutePlanTable:
+    """Parse the entire Excel route plan into a columnar table"""
+    import openpyxl  # Deferred: slow to import and only needed for sync
+    
     wb = openpyxl.load_workbook(file_path)
     
     if '4-Week Route Plan' not in wb.sheetnames:
@@ -55,7 +80,7 @@ def parse_excel_route_plan(file_path: str) -> List[Dict]:
         
     ws = wb['4-Week Route Plan']
     
-    customers = []
+    customers = RoutePlanTable()
     
     # Define week starting rows
     week_configs = [
@@ -110,24 +135,37 @@ def parse_excel_route_plan(file_path: str) -> List[Dict]:
                 if not customer_data:
                     continue
                 
-                customers.append({
-                    **customer_data,
-                    "week_number": week_number,
-                    "week_label": week_label,
-                    "day_of_week": date_info["day_of_week"],
-                    "date": date_info["date"],
-                    "location": locations[day_idx],
-                    "stop_number": stop_number
-                })
+                customers.append(
+                    customer_data["name"],
+                    customer_data["address"],
+                    customer_data["account_number"],
+                    customer_data["latitude"],
+                    customer_data["longitude"],
+                    week_number,
+                    week_label,
+                    date_info["day_of_week"],
+                    date_info["date"],
+                    locations[day_idx],
+                    stop_number
+                )
     
     return customers
 
 
-def export_tracking_data(customers_with_visits: List[Dict], output_path: str):
-    """Export tracking data back to a new Excel sheet"""
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Visit Tracking"
+def export_tracking_data(
+    customers: RoutePlanTable,
+    output_path: str,
+    latest_visits: Optional[List[Optional[Dict]]] = None
+):
+    """Export tracking data back to a new Excel sheet.
+    
+    latest_visits[i] is the latest visit of customer row i (None if unvisited).
+    """
+    import openpyxl
+    
+    # Write-only mode streams rows instead of keeping every cell object in memory
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Visit Tracking")
     
     # Headers
     headers = [
@@ -139,17 +177,19 @@ def export_tracking_data(customers_with_visits: List[Dict], output_path: str):
     ws.append(headers)
     
     # Data rows
-    for customer in customers_with_visits:
-        visit = customer.get("latest_visit", {})
+    for i in range(len(customers)):
+        (name, address, account_number, _, _,
+         _, week_label, day_of_week, date, location, stop_number) = customers.row_values(i)
+        visit = (latest_visits[i] if latest_visits else None) or NOT_VISITED
         ws.append([
-            customer["week_label"],
-            customer["day_of_week"],
-            customer["date"].strftime("%m/%d/%Y") if customer["date"] else "",
-            customer["location"],
-            customer["stop_number"],
-            customer["name"],
-            customer["account_number"],
-            customer["address"],
+            week_label,
+            day_of_week,
+            date.strftime("%m/%d/%Y") if date else "",
+            location,
+            stop_number,
+            name,
+            account_number,
+            address,
             visit.get("status", "not_visited"),
             visit.get("visited_at", ""),
             visit.get("sales_amount", 0.0),
@@ -159,3 +199,11 @@ def export_tracking_data(customers_with_visits: List[Dict], output_path: str):
         ])
     
     wb.save(output_path)
+
+
+def parse_workbook_safe(file_path: str) -> Tuple[str, RoutePlanTable, Optional[str]]:
+    """Parse one workbook for a worker process; errors are returned, not raised"""
+    try:
+        return file_path, parse_excel_route_plan(file_path), None
+    except Exception as e:
+        return file_path, RoutePlanTable(), f"{type(e).__name__}: {e}"
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from typing import Optional
+
+
+class CachedExport:
+    """A generated tracking workbook and the data fingerprint it was built from"""
+
+    __slots__ = ("territory", "fingerprint", "path", "customers", "generated_at")
+
+    def __init__(self, territory: str, fingerprint: str, path: str, customers: int):
+        self.territory = territory
+        self.fingerprint = fingerprint
+        self.path = path
+        self.customers = customers
+        self.generated_at = datetime.utcnow()
+
+
+class TrackingExportCache:
+    """Last tracking workbook generated per territory, plus what was last uploaded where.
+    
+    Exports whose fingerprint matches reuse the cached file instead of querying
+    and rebuilding it. Per process: each worker regenerates once after a restart.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._exports = {}  # territory -> CachedExport
+        self._uploaded = {}  # (territory, destination) -> fingerprint
+        self._directory = None
+
+    def get(self, territory: str, fingerprint: str) -> Optional[CachedExport]:
+        with self._lock:
+            export = self._exports.get(territory)
+        if export is None or export.fingerprint != fingerprint or not os.path.exists(export.path):
+            return None
+        return export
+
+    def put(self, territory: str, fingerprint: str, path: str, customers: int) -> CachedExport:
+        """Take ownership of a freshly generated workbook, replacing the territory's previous one"""
+        with self._lock:
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix="tracking-exports-")
+            cached_path = os.path.join(self._directory, f"{fingerprint}.xlsx")
+            shutil.move(path, cached_path)
+            previous = self._exports.get(territory)
+            export = self._exports[territory] = CachedExport(territory, fingerprint, cached_path, customers)
+        if previous is not None and previous.path != cached_path and os.path.exists(previous.path):
+            os.unlink(previous.path)
+        return export
+
+    def link(self, export: CachedExport) -> str:
+        """A private copy of the workbook for a job artifact (a hard link where possible)"""
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        os.unlink(path)
+        try:
+            os.link(export.path, path)
+        except OSError:
+            shutil.copyfile(export.path, path)
+        return path
+
+    def uploaded(self, territory: str, destination: str) -> Optional[str]:
+        """Fingerprint of the data last uploaded to destination"""
+        return self._uploaded.get((territory, destination))
+
+    def mark_uploaded(self, territory: str, destination: str, fingerprint: str):
+        self._uploaded[(territory, destination)] = fingerprint
+
+    def clear(self):
+        with self._lock:
+            directory, self._directory = self._directory, None
+            self._exports.clear()
+            self._uploaded.clear()
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+# Global instance
+export_cache = TrackingExportCache()
@@ -0,0 +1,183 @@
+import heapq
+import math
+import threading
+import time
+from array import array
+from collections import defaultdict
+from datetime import date
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.customer import Customer
+from app.services.events import event_broker
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+CELL_DEGREES = 0.05  # About 5.5 km north-south
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def cell_of(lat: float, lng: float) -> Tuple[int, int]:
+    return math.floor(lat / CELL_DEGREES), math.floor(lng / CELL_DEGREES)
+
+
+class CustomerGrid:
+    """Customers with coordinates bucketed into a fixed lat/lng grid.
+    
+    A k-nearest query scans rings of cells around the query point and stops
+    once no unscanned cell can hold anything closer than the k-th match, so it
+    touches a few cells rather than every customer. Rings start at the first
+    one reaching the grid's bounds, and a query that would visit more cells
+    than there are customers (a point far outside the territory) scans the
+    customers instead.
+    """
+
+    __slots__ = ("ids", "latitudes", "longitudes", "dates", "cells", "anchor", "bounds")
+
+    def __init__(self, rows, anchor: Optional[date] = None):
+        """rows: (id, latitude, longitude, date); anchor: the route plan's first date"""
+        self.ids = array("q")
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self.dates = []
+        self.cells = defaultdict(list)  # (lat cell, lng cell) -> row positions
+        self.anchor = anchor
+        for customer_id, latitude, longitude, plan_date in rows:
+            self.cells[cell_of(latitude, longitude)].append(len(self.ids))
+            self.ids.append(customer_id)
+            self.latitudes.append(latitude)
+            self.longitudes.append(longitude)
+            self.dates.append(plan_date)
+        
+        if self.cells:
+            lat_cells = [cell[0] for cell in self.cells]
+            lng_cells = [cell[1] for cell in self.cells]
+            self.bounds = (min(lat_cells), max(lat_cells), min(lng_cells), max(lng_cells))
+        else:
+            self.bounds = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int,
+        max_km: Optional[float] = None,
+        exclude_date: Optional[date] = None
+    ) -> List[Tuple[float, int]]:
+        """Up to k (distance_km, customer_id) pairs, nearest first"""
+        if self.bounds is None:
+            return []
+        
+        lat_cell, lng_cell = cell_of(lat, lng)
+        min_lat, max_lat, min_lng, max_lng = self.bounds
+        # Rings inside this one lie wholly outside the bounds: nothing to find there
+        first_ring = max(0, min_lat - lat_cell, lat_cell - max_lat, min_lng - lng_cell, lng_cell - max_lng)
+        max_ring = max(abs(lat_cell - min_lat), abs(lat_cell - max_lat),
+                       abs(lng_cell - min_lng), abs(lng_cell - max_lng))
+        best = []  # Max-heap of (-distance, id) holding the k nearest so far
+        
+        def consider(i: int):
+            if exclude_date is not None and self.dates[i] == exclude_date:
+                return
+            distance = haversine_km(lat, lng, self.latitudes[i], self.longitudes[i])
+            if max_km is not None and distance > max_km:
+                return
+            if len(best) < k:
+                heapq.heappush(best, (-distance, self.ids[i]))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, self.ids[i]))
+        
+        cells_visited = 0
+        for ring in range(first_ring, max_ring + 1):
+            cells_visited += 8 * ring or 1
+            if cells_visited > len(self):
+                # Cheaper to check every customer than to keep walking cells
+                best.clear()
+                for i in range(len(self)):
+                    consider(i)
+                break
+            
+            for cell in self._ring(lat_cell, lng_cell, ring):
+                for i in self.cells.get(cell, ()):
+                    consider(i)
+            
+            # Cells beyond this ring are at least `ring` cells away along one axis
+            reach = ring * CELL_DEGREES * KM_PER_DEGREE * math.cos(
+                math.radians(min(89.0, abs(lat) + (ring + 1) * CELL_DEGREES))
+            )
+            if max_km is not None and reach >= max_km:
+                break
+            if len(best) == k and reach >= -best[0][0]:
+                break
+        
+        return sorted((-distance, customer_id) for distance, customer_id in best)
+
+    @staticmethod
+    def _ring(lat_cell: int, lng_cell: int, ring: int):
+        if ring == 0:
+            yield lat_cell, lng_cell
+            return
+        for d in range(-ring, ring + 1):
+            yield lat_cell - ring, lng_cell + d
+            yield lat_cell + ring, lng_cell + d
+        for d in range(-ring + 1, ring):
+            yield lat_cell + d, lng_cell - ring
+            yield lat_cell + d, lng_cell + ring
+
+
+class GeoIndexCache:
+    """One CustomerGrid per territory, rebuilt after route plan imports or the TTL"""
+
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0  # Bumped by every invalidation
+        self._lock = threading.Lock()
+        self._grids = {}  # territory -> (expires_at, CustomerGrid)
+
+    def get(self, db: Session, territory: str) -> CustomerGrid:
+        with self._lock:
+            entry = self._grids.get(territory)
+            generation = self.generation
+        if entry is not None and entry[0] >= time.monotonic():
+            return entry[1]
+        
+        rows = db.query(Customer.id, Customer.latitude, Customer.longitude, Customer.date).filter(
+            Customer.territory == territory
+        ).all()
+        dates = [row.date for row in rows if row.date is not None]
+        grid = CustomerGrid(
+            [row for row in rows if row.latitude is not None and row.longitude is not None],
+            anchor=min(dates) if dates else None
+        )
+        
+        with self._lock:
+            # Built from data read before an invalidation: use it once, don't keep it
+            if generation == self.generation:
+                self._grids[territory] = (time.monotonic() + self.ttl_seconds, grid)
+        return grid
+
+    def invalidate(self, territory: Optional[str] = None):
+        with self._lock:
+            self.generation += 1
+            if territory is None:
+                self._grids.clear()
+            else:
+                self._grids.pop(territory, None)
+
+    def handle_event(self, event: dict):
+        """Event broker listener: route plan imports move customers"""
+        if event.get("type", "").startswith("route_plan."):
+            self.invalidate(event.get("territory"))
+
+
+# Global instance
+geo_index = GeoIndexCache(settings.ROUTE_CACHE_TTL_SECONDS)
+event_broker.add_listener(geo_index.handle_event)
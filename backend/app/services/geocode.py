@@ -0,0 +1,52 @@
+import csv
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+
+
+def normalize_address(address: Optional[str]) -> str:
+    return " ".join((address or "").upper().split())
+
+
+@lru_cache(maxsize=4)
+def load_geocode_table(path: str) -> Dict[str, Tuple[float, float]]:
+    """Load an offline geocode CSV with account_number and/or address columns
+    plus latitude and longitude"""
+    table = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            try:
+                coords = (float(row["latitude"]), float(row["longitude"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            
+            if row.get("account_number"):
+                table[f"acct:{row['account_number'].strip()}"] = coords
+            if row.get("address"):
+                table[f"addr:{normalize_address(row['address'])}"] = coords
+    
+    return table
+
+
+def fill_coordinates(customers_data: List[Dict], path: Optional[str] = None) -> int:
+    """Fill missing coordinates from the geocode table; returns rows filled"""
+    path = path or settings.GEOCODE_TABLE_PATH
+    if not path or not os.path.exists(path):
+        return 0
+    
+    table = load_geocode_table(path)
+    filled = 0
+    for customer in customers_data:
+        if customer.get("latitude") is not None and customer.get("longitude") is not None:
+            continue
+        
+        coords = (
+            table.get(f"acct:{customer.get('account_number')}")
+            or table.get(f"addr:{normalize_address(customer.get('address'))}")
+        )
+        if coords:
+            customer["latitude"], customer["longitude"] = coords
+            filled += 1
+    
+    return filled
@@ -0,0 +1,180 @@
+import os
+import secrets
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import copy_context
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from app.core.config import settings
+from app.core.metrics import SYNC_STAGE_DURATION
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """A long-running sync operation with stage-level progress"""
+
+    def __init__(self, territory: str, kind: str, stages: List[str]):
+        self.id = secrets.token_urlsafe(12)
+        self.territory = territory
+        self.kind = kind
+        self.status = "queued"  # queued, running, succeeded, failed, cancelled
+        self.stages = {name: {"name": name, "status": "pending", "started_at": None, "finished_at": None}
+                       for name in stages}
+        self.stage = None
+        self.result = None
+        self.input_path = None  # Temporary input file, removed when the job ends
+        self.artifact_path = None
+        self.artifact_filename = None
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def progress(self) -> float:
+        done = sum(1 for s in self.stages.values() if s["status"] == "done")
+        return round(done / len(self.stages) * 100, 1) if self.stages else 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    @contextmanager
+    def run_stage(self, name: str):
+        """Mark a stage as running for the duration of the block"""
+        self.check_cancelled()
+        stage = self.stages[name]
+        stage["status"] = "running"
+        stage["started_at"] = datetime.utcnow()
+        self.stage = name
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            stage["status"] = "failed"
+            stage["finished_at"] = datetime.utcnow()
+            SYNC_STAGE_DURATION.labels(self.kind, name, "failed").observe(time.perf_counter() - start)
+            raise
+        stage["status"] = "done"
+        stage["finished_at"] = datetime.utcnow()
+        SYNC_STAGE_DURATION.labels(self.kind, name, "done").observe(time.perf_counter() - start)
+
+    def set_artifact(self, path: str, filename: str):
+        self.artifact_path = path
+        self.artifact_filename = filename
+
+    def remove_input(self):
+        if self.input_path and os.path.exists(self.input_path):
+            os.unlink(self.input_path)
+
+    def cleanup(self):
+        self.remove_input()
+        if self.artifact_path and os.path.exists(self.artifact_path):
+            os.unlink(self.artifact_path)
+
+
+class JobManager:
+    """Runs jobs on a bounded worker pool and keeps them after the request ends"""
+
+    def __init__(self, max_workers: int = 2, ttl_seconds: int = 3600):
+        self.ttl_seconds = ttl_seconds
+        self.max_workers = max_workers
+        self._executor = None  # Started with the first job
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, territory: str, kind: str, stages: List[str], fn: Callable, *args,
+               input_path: Optional[str] = None) -> Job:
+        """Queue fn(job, territory, *args); its return value becomes the job result"""
+        self.prune()
+        job = Job(territory, kind, stages)
+        job.input_path = input_path
+        with self._lock:
+            self._jobs[job.id] = job
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+            executor = self._executor
+        # Run in a copy of the caller's context so job logs carry the request id
+        executor.submit(copy_context().run, self._run, job, fn, args)
+        return job
+
+    def _run(self, job: Job, fn: Callable, args: tuple):
+        if job.cancel_requested:
+            job.status = "cancelled"
+            job.finished_at = datetime.utcnow()
+            job.remove_input()
+            return
+
+        job.status = "running"
+        try:
+            job.result = fn(job, job.territory, *args)
+            job.status = "succeeded"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            logger.exception("Job failed", extra={"job_id": job.id, "job_kind": job.kind, "territory": job.territory})
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.stage = None
+            job.finished_at = datetime.utcnow()
+            job.remove_input()
+
+    def get(self, job_id: str, territory: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        return job if job and job.territory == territory else None
+
+    def pending(self, kinds) -> int:
+        """Queued or running jobs of the given kinds"""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.kind in kinds and not job.finished)
+
+    def cancel(self, job_id: str, territory: str) -> Optional[Job]:
+        job = self.get(job_id, territory)
+        if job and not job.finished:
+            job.cancel()
+        return job
+
+    def prune(self):
+        """Forget finished jobs (and their artifacts) older than the TTL"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        with self._lock:
+            expired = [
+                job for job in self._jobs.values()
+                if job.finished and job.finished_at < cutoff
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            job.cleanup()
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            job.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global instance
+job_manager = JobManager(settings.JOB_WORKERS, settings.JOB_TTL_SECONDS)
@@ -0,0 +1,90 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import inspect, or_, select, text, true, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models.customer import Customer
+from app.models.visit import Visit
+
+# Columns added to customers for deployments created before they existed
+LATEST_VISIT_COLUMNS = {
+    "latest_visit_id": "INTEGER",
+    "latest_status": "SMALLINT",
+    "latest_visited_at": "TIMESTAMP",
+}
+
+
+def set_latest_visit(customer: Customer, visit: Optional[Visit]):
+    """Point the customer's denormalized latest-visit columns at visit (or clear them)"""
+    customer.latest_visit_id = visit.id if visit else None
+    customer.latest_status = visit.status if visit else None
+    customer.latest_visited_at = visit.visited_at if visit else None
+
+
+def latest_visit_in_cycle(cycle_start: Optional[datetime]):
+    """Criterion: the customer's latest-visit columns belong to the cycle starting at cycle_start.
+    
+    The columns are only re-scoped to a new cycle when archive_visits.py runs, so
+    right after a rollover they still describe last cycle's visit. A latest
+    visit never marked visited (no visited_at) reads the same in any cycle.
+    """
+    if cycle_start is None:
+        return true()
+    return or_(Customer.latest_visited_at.is_(None), Customer.latest_visited_at >= cycle_start)
+
+
+def refresh_latest_visit(db: Session, customer: Customer, since: Optional[datetime] = None):
+    """Recompute one customer's latest visit (newest updated_at, then id) created since `since`"""
+    query = db.query(Visit).filter(
+        Visit.territory == customer.territory,
+        Visit.customer_id == customer.id
+    )
+    if since is not None:
+        query = query.filter(Visit.created_at >= since)
+
+    set_latest_visit(customer, query.order_by(Visit.updated_at.desc(), Visit.id.desc()).first())
+
+
+def repair_latest_visits(db: Session, territory: str, since: Optional[datetime] = None) -> int:
+    """Recompute every customer's latest-visit columns in one statement (uncommitted).
+
+    Only rows that disagree with the visits table are written, so their
+    updated_at (and the change feed) moves only when something was wrong or
+    archived. Returns the number of customers corrected.
+    """
+    criteria = [Visit.territory == Customer.territory, Visit.customer_id == Customer.id]
+    if since is not None:
+        criteria.append(Visit.created_at >= since)
+
+    def latest(column):
+        return select(column).where(*criteria).order_by(
+            Visit.updated_at.desc(), Visit.id.desc()
+        ).limit(1).correlate(Customer).scalar_subquery()
+
+    latest_id, latest_status, latest_visited_at = latest(Visit.id), latest(Visit.status), latest(Visit.visited_at)
+    result = db.execute(
+        update(Customer)
+        .where(
+            Customer.territory == territory,
+            Customer.latest_visit_id.is_distinct_from(latest_id)
+            | Customer.latest_status.is_distinct_from(latest_status)
+            | Customer.latest_visited_at.is_distinct_from(latest_visited_at)
+        )
+        .values(
+            latest_visit_id=latest_id,
+            latest_status=latest_status,
+            latest_visited_at=latest_visited_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def ensure_latest_visit_columns(engine: Engine) -> list:
+    """Add the latest-visit columns to an existing customers table; returns those added"""
+    with engine.begin() as conn:
+        existing = {column["name"] for column in inspect(conn).get_columns("customers")}
+        added = [name for name in LATEST_VISIT_COLUMNS if name not in existing]
+        for name in added:
+            conn.execute(text(f"ALTER TABLE customers ADD COLUMN {name} {LATEST_VISIT_COLUMNS[name]}"))
+    return added
@@ -1,9 +1,15 @@
-import msal
-import requests
 from typing import Optional
+from fastapi import Request
 from app.core.config import settings
+from app.core.metrics import track_graph_call
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
+# msal and requests are imported on first use; they are only needed for
+# OneDrive sign-in and sync, not to serve the API
+
 
 class OneDriveService:
     def __init__(self):
@@ -13,13 +19,18 @@ class OneDriveService:
         self.scopes = settings.MICROSOFT_SCOPES
         self.redirect_uri = settings.MICROSOFT_REDIRECT_URI
         
-    def get_auth_url(self, state: str = None):
-        """Get the authorization URL for OAuth flow"""
-        app = msal.ConfidentialClientApplication(
+    def _client_app(self):
+        import msal
+        
+        return msal.ConfidentialClientApplication(
             self.client_id,
             authority=self.authority,
             client_credential=self.client_secret
         )
+    
+    def get_auth_url(self, state: str = None):
+        """Get the authorization URL for OAuth flow"""
+        app = self._client_app()
         
         auth_url = app.get_authorization_request_url(
             scopes=self.scopes,
@@ -30,17 +41,14 @@ class OneDriveService:
     
     def get_token_from_code(self, code: str):
         """Exchange authorization code for access token"""
-        app = msal.ConfidentialClientApplication(
-            self.client_id,
-            authority=self.authority,
-            client_credential=self.client_secret
-        )
+        app = self._client_app()
         
-        result = app.acquire_token_by_authorization_code(
-            code,
-            scopes=self.scopes,
-            redirect_uri=self.redirect_uri
-        )
+        with track_graph_call("acquire_token"):
+            result = app.acquire_token_by_authorization_code(
+                code,
+                scopes=self.scopes,
+                redirect_uri=self.redirect_uri
+            )
         
         if "access_token" in result:
             return result
@@ -49,16 +57,13 @@ class OneDriveService:
     
     def refresh_token(self, refresh_token: str):
         """Refresh an expired access token"""
-        app = msal.ConfidentialClientApplication(
-            self.client_id,
-            authority=self.authority,
-            client_credential=self.client_secret
-        )
+        app = self._client_app()
         
-        result = app.acquire_token_by_refresh_token(
-            refresh_token,
-            scopes=self.scopes
-        )
+        with track_graph_call("refresh_token"):
+            result = app.acquire_token_by_refresh_token(
+                refresh_token,
+                scopes=self.scopes
+            )
         
         if "access_token" in result:
             return result
@@ -67,6 +72,8 @@ class OneDriveService:
     
     def get_file_content(self, access_token: str, file_path: str) -> bytes:
         """Download file content from OneDrive"""
+        import requests
+        
         # Search for the file first
         search_url = "https://graph.microsoft.com/v1.0/me/drive/root/search(q='{}')"
         file_name = os.path.basename(file_path)
@@ -76,37 +83,40 @@ class OneDriveService:
             "Content-Type": "application/json"
         }
         
-        print(f"SEARCHING FOR FILE: {file_name}")
+        logger.info("Searching OneDrive for file", extra={"file_name": file_name})
         # Search for file
-        response = requests.get(
-            search_url.format(file_name),
-            headers=headers
-        )
-        
-        if response.status_code != 200:
-            print(f"SEARCH FAILED: {response.text}")
-            raise Exception(f"Failed to search for file: {response.text}")
+        with track_graph_call("search"):
+            response = requests.get(
+                search_url.format(file_name),
+                headers=headers
+            )
+            
+            if response.status_code != 200:
+                logger.warning("OneDrive search failed", extra={"status": response.status_code, "body": response.text})
+                raise Exception(f"Failed to search for file: {response.text}")
         
         search_results = response.json()
-        print(f"FOUND {len(search_results.get('value', []))} MATCHES")
+        logger.info("OneDrive search finished", extra={"matches": len(search_results.get("value", []))})
         if not search_results.get("value"):
             raise Exception(f"File not found: {file_name}")
         
         # Get the first match
         file_item = search_results["value"][0]
         download_url = file_item["@microsoft.graph.downloadUrl"]
-        print(f"DOWNLOADING FROM: {download_url[:50]}...")
         
         # Download file content
-        file_response = requests.get(download_url)
-        if file_response.status_code != 200:
-            print(f"DOWNLOAD FAILED: {file_response.text}")
-            raise Exception(f"Failed to download file: {file_response.text}")
+        with track_graph_call("download"):
+            file_response = requests.get(download_url)
+            if file_response.status_code != 200:
+                logger.warning("OneDrive download failed", extra={"status": file_response.status_code, "body": file_response.text})
+                raise Exception(f"Failed to download file: {file_response.text}")
         
         return file_response.content
     
     def upload_file_content(self, access_token: str, file_path: str, content: bytes):
         """Upload file content to OneDrive"""
+        import requests
+        
         file_name = os.path.basename(file_path)
         dir_path = os.path.dirname(file_path)
         
@@ -121,15 +131,18 @@ class OneDriveService:
             "Content-Type": "application/octet-stream"
         }
         
-        response = requests.put(upload_url, headers=headers, data=content)
-        
-        if response.status_code not in [200, 201]:
-            raise Exception(f"Failed to upload file: {response.text}")
+        with track_graph_call("upload"):
+            response = requests.put(upload_url, headers=headers, data=content)
+            
+            if response.status_code not in [200, 201]:
+                raise Exception(f"Failed to upload file: {response.text}")
         
         return response.json()
     
     def create_folder(self, access_token: str, folder_path: str):
         """Create a folder in OneDrive"""
+        import requests
+        
         headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json"
@@ -149,13 +162,19 @@ class OneDriveService:
             "@microsoft.graph.conflictBehavior": "rename"
         }
         
-        response = requests.post(create_url, headers=headers, json=data)
-        
-        if response.status_code not in [200, 201]:
-            raise Exception(f"Failed to create folder: {response.text}")
+        with track_graph_call("create_folder"):
+            response = requests.post(create_url, headers=headers, json=data)
+            
+            if response.status_code not in [200, 201]:
+                raise Exception(f"Failed to create folder: {response.text}")
         
         return response.json()
 
 
-# Global instance
-onedrive_service = OneDriveService()
+def get_onedrive_service(request: Request) -> OneDriveService:
+    """The OneDrive service built by the application lifespan"""
+    service = getattr(request.app.state, "onedrive", None)
+    if service is None:
+        # Lifespan did not run (e.g. TestClient used without a with-block)
+        service = request.app.state.onedrive = OneDriveService()
+    return service
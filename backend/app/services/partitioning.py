@@ -0,0 +1,231 @@
+import hashlib
+import re
+from datetime import date, datetime
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from app.core.tenancy import validate_territory
+from app.models.customer import Customer, SEARCH_INDEX_STATEMENTS
+from app.models.visit import Visit
+
+# Postgres LIST partitioning of customers by territory is opt-in: run
+# partition_territories.py once, after which imports create missing partitions.
+_partitioned_cache = {}
+
+
+def partition_name(table: str, territory: str) -> str:
+    slug = re.sub(r"[^a-z0-9_]", "_", territory.lower())[:40]
+    digest = hashlib.md5(territory.encode()).hexdigest()[:8]
+    return f"{table}_t_{slug}_{digest}"
+
+
+def territory_literal(territory: str) -> str:
+    return "'" + validate_territory(territory).replace("'", "''") + "'"
+
+
+def is_partitioned(conn: Connection, table: str = "customers") -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    
+    # Only positive answers are cached, so running workers notice a later conversion
+    if table not in _partitioned_cache:
+        if conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table)"
+        ), {"table": table}).scalar():
+            _partitioned_cache[table] = True
+    return _partitioned_cache.get(table, False)
+
+
+def create_territory_partition(conn: Connection, territory: str, table: str = "customers"):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, territory)} "
+        f"PARTITION OF {table} FOR VALUES IN ({territory_literal(territory)})"
+    ))
+
+
+def ensure_territory_partition(db: Session, territory: str):
+    """Give a territory its own partition (no-op unless customers is partitioned)"""
+    conn = db.connection()
+    if is_partitioned(conn):
+        create_territory_partition(conn, territory)
+
+
+def partition_customers_by_territory(engine: Engine) -> List[str]:
+    """Convert customers into a LIST-partitioned table, one partition per territory.
+    
+    The primary key becomes (id, territory) and the visits foreign key becomes
+    (customer_id, territory). Every unique index includes the partition key, so
+    all secondary indexes are recreated on the partitioned parent.
+    """
+    if engine.dialect.name != "postgresql":
+        raise RuntimeError("Table partitioning requires PostgreSQL")
+    
+    _partitioned_cache.clear()
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            return []
+        
+        territories = [row[0] for row in conn.execute(text("SELECT DISTINCT territory FROM customers"))]
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence('customers', 'id')")).scalar()
+        
+        conn.execute(text("ALTER TABLE visits DROP CONSTRAINT IF EXISTS visits_customer_id_fkey"))
+        conn.execute(text("ALTER TABLE customers RENAME TO customers_unpartitioned"))
+        conn.execute(text(
+            "CREATE TABLE customers (LIKE customers_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY LIST (territory)"
+        ))
+        conn.execute(text("ALTER TABLE customers ADD PRIMARY KEY (id, territory)"))
+        conn.execute(text("CREATE TABLE customers_default PARTITION OF customers DEFAULT"))
+        for territory in territories:
+            create_territory_partition(conn, territory)
+        
+        conn.execute(text("INSERT INTO customers SELECT * FROM customers_unpartitioned"))
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY customers.id"))
+        conn.execute(text("DROP TABLE customers_unpartitioned"))
+        
+        # Recreate secondary indexes on the partitioned parent
+        for index in Customer.__table__.indexes:
+            index.create(conn, checkfirst=True)
+        for statement in SEARCH_INDEX_STATEMENTS:
+            conn.execute(text(statement))
+        
+        conn.execute(text(
+            "ALTER TABLE visits ADD CONSTRAINT visits_customer_territory_fkey "
+            "FOREIGN KEY (customer_id, territory) REFERENCES customers (id, territory)"
+        ))
+    
+    _partitioned_cache.clear()
+    return [partition_name("customers", t) for t in territories]
+
+
+# Postgres RANGE partitioning of visits by created_at month is also opt-in:
+# run partition_visits.py once, then archive_visits.py on a schedule to keep
+# partitions ahead of time and drop the emptied ones.
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def visit_partition_name(month: date) -> str:
+    return f"visits_p{month.year:04d}_{month.month:02d}"
+
+
+def create_visit_partition(conn: Connection, month: date):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {visit_partition_name(month)} PARTITION OF visits "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    ))
+
+
+def ensure_visit_partitions(engine: Engine, months_ahead: int = 3) -> List[str]:
+    """Create partitions for the current and next months (no-op unless partitioned)"""
+    if engine.dialect.name != "postgresql":
+        return []
+    
+    created = []
+    with engine.begin() as conn:
+        if not is_partitioned(conn, "visits"):
+            return []
+        month = month_start(datetime.utcnow().date())
+        for _ in range(months_ahead + 1):
+            create_visit_partition(conn, month)
+            created.append(visit_partition_name(month))
+            month = next_month(month)
+    return created
+
+
+def drop_empty_visit_partitions(engine: Engine, before: datetime) -> List[str]:
+    """Drop monthly partitions that end before `before` and hold no rows"""
+    if engine.dialect.name != "postgresql":
+        return []
+    
+    dropped = []
+    with engine.begin() as conn:
+        if not is_partitioned(conn, "visits"):
+            return []
+        partitions = [row[0] for row in conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'visits'::regclass"
+        ))]
+        for name in partitions:
+            match = re.fullmatch(r"visits_p(\d{4})_(\d{2})", name)
+            if not match:
+                continue
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            if datetime.combine(next_month(month), datetime.min.time()) > before:
+                continue
+            if conn.execute(text(f"SELECT NOT EXISTS (SELECT 1 FROM {name})")).scalar():
+                conn.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+    return dropped
+
+
+def partition_visits_by_month(engine: Engine, months_ahead: int = 3) -> List[str]:
+    """Convert visits into a RANGE-partitioned table with one partition per created_at month.
+    
+    The primary key becomes (id, created_at). Rows outside the monthly
+    partitions land in visits_default.
+    """
+    if engine.dialect.name != "postgresql":
+        raise RuntimeError("Table partitioning requires PostgreSQL")
+    
+    _partitioned_cache.pop("visits", None)
+    with engine.begin() as conn:
+        if is_partitioned(conn, "visits"):
+            return []
+        
+        customers_partitioned = is_partitioned(conn, "customers")
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence('visits', 'id')")).scalar()
+        
+        conn.execute(text(
+            "UPDATE visits SET created_at = COALESCE(updated_at, now()) WHERE created_at IS NULL"
+        ))
+        first = conn.execute(text("SELECT min(created_at) FROM visits")).scalar()
+        
+        conn.execute(text("ALTER TABLE visits RENAME TO visits_unpartitioned"))
+        conn.execute(text(
+            "CREATE TABLE visits (LIKE visits_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (created_at)"
+        ))
+        conn.execute(text("ALTER TABLE visits ADD PRIMARY KEY (id, created_at)"))
+        conn.execute(text("CREATE TABLE visits_default PARTITION OF visits DEFAULT"))
+        
+        month = month_start((first or datetime.utcnow()).date())
+        last = month_start(datetime.utcnow().date())
+        for _ in range(months_ahead):
+            last = next_month(last)
+        partitions = []
+        while month <= last:
+            create_visit_partition(conn, month)
+            partitions.append(visit_partition_name(month))
+            month = next_month(month)
+        
+        conn.execute(text("INSERT INTO visits SELECT * FROM visits_unpartitioned"))
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY visits.id"))
+        conn.execute(text("DROP TABLE visits_unpartitioned"))
+        
+        for index in Visit.__table__.indexes:
+            if not index.unique:
+                index.create(conn, checkfirst=True)
+        
+        if customers_partitioned:
+            conn.execute(text(
+                "ALTER TABLE visits ADD CONSTRAINT visits_customer_territory_fkey "
+                "FOREIGN KEY (customer_id, territory) REFERENCES customers (id, territory)"
+            ))
+        else:
+            conn.execute(text(
+                "ALTER TABLE visits ADD CONSTRAINT visits_customer_id_fkey "
+                "FOREIGN KEY (customer_id) REFERENCES customers (id)"
+            ))
+    
+    _partitioned_cache.pop("visits", None)
+    return partitions
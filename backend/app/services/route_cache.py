@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import ROUTE_CACHE_REQUESTS, ROUTE_CACHE_EVICTIONS
+from app.services.events import event_broker
+
+# (territory, week_number, day_of_week, location) with None meaning "any",
+# or (territory, "date", date) for a daily route
+RouteDayKey = Tuple[str, Any, ...]
+
+
+class RouteDayCache:
+    """LRU cache of serialized route-day customer lists.
+
+    Entries remember which customers they contain, so a visit write only drops
+    the entries listing that customer. Route plan imports and reorders drop
+    the whole territory. Entries also expire after ttl_seconds to bound
+    staleness from writes made outside the API (CLI scripts).
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0  # Bumped by every invalidation
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, body, customer ids)
+        self._keys_by_customer = defaultdict(set)  # customer id -> keys listing it
+
+    def get(self, key: RouteDayKey) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                ROUTE_CACHE_REQUESTS.labels("miss").inc()
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            ROUTE_CACHE_REQUESTS.labels("hit").inc()
+            return entry[1]
+
+    def set(self, key: RouteDayKey, body: bytes, customer_ids, generation: int):
+        """Store a response built from data read when self.generation was generation.
+        
+        If anything was invalidated since, the response may be stale and is dropped.
+        """
+        customer_ids = frozenset(customer_ids)
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, body, customer_ids)
+            for customer_id in customer_ids:
+                self._keys_by_customer[customer_id].add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+                ROUTE_CACHE_EVICTIONS.inc()
+
+    def invalidate_customer(self, customer_id: int):
+        """Drop the route-day entries listing this customer"""
+        with self._lock:
+            self.generation += 1
+            for key in list(self._keys_by_customer.get(customer_id, ())):
+                self._remove(key)
+
+    def invalidate_territory(self, territory: Optional[str] = None):
+        """Drop a territory's entries, or everything"""
+        with self._lock:
+            self.generation += 1
+            for key in [k for k in self._entries if territory is None or k[0] == territory]:
+                self._remove(key)
+
+    def _remove(self, key: RouteDayKey):
+        _, _, customer_ids = self._entries.pop(key)
+        for customer_id in customer_ids:
+            keys = self._keys_by_customer.get(customer_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_customer[customer_id]
+
+    def handle_event(self, event: dict):
+        """Event broker listener; with Redis this keeps every worker's cache in step"""
+        event_type = event.get("type", "")
+        if event_type.startswith("visit."):
+            customer_id = (event.get("data") or {}).get("customer_id")
+            if customer_id is not None:
+                self.invalidate_customer(customer_id)
+        elif event_type.startswith("route_plan."):
+            self.invalidate_territory(event.get("territory"))
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Global instance
+route_cache = RouteDayCache(settings.ROUTE_CACHE_SIZE, settings.ROUTE_CACHE_TTL_SECONDS)
+event_broker.add_listener(route_cache.handle_event)
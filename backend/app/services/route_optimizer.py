@@ -0,0 +1,165 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def distance_matrix(coords: np.ndarray) -> np.ndarray:
+    """Great-circle distances (km) between every pair of (lat, lng) rows"""
+    lat = np.radians(coords[:, 0])[:, None]
+    lng = np.radians(coords[:, 1])[:, None]
+
+    dlat = lat - lat.T
+    dlng = lng - lng.T
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def route_length(route: np.ndarray, dist: np.ndarray) -> float:
+    """Length of an open path visiting stops in the given order"""
+    if len(route) < 2:
+        return 0.0
+    return float(dist[route[:-1], route[1:]].sum())
+
+
+def nearest_neighbor(dist: np.ndarray, start: int = 0) -> np.ndarray:
+    """Greedy tour construction starting from the given stop"""
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    route = np.empty(n, dtype=np.int64)
+
+    current = start
+    for position in range(n):
+        route[position] = current
+        visited[current] = True
+        if position == n - 1:
+            break
+        candidates = np.where(visited, np.inf, dist[current])
+        current = int(np.argmin(candidates))
+
+    return route
+
+
+def two_opt(route: np.ndarray, dist: np.ndarray, max_passes: int = 50) -> np.ndarray:
+    """Improve an open path by reversing segments; the first stop stays fixed"""
+    route = route.copy()
+    n = len(route)
+    if n < 4:
+        return route
+
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, n - 1):
+            # Reverse route[i..j] for every j > i at once
+            a, b = route[i - 1], route[i]
+            c = route[i + 1:]
+            e = np.append(route[i + 2:], -1)
+
+            removed = dist[a, b] + np.where(e >= 0, dist[c, e], 0.0)
+            added = dist[a, c] + np.where(e >= 0, dist[b, e], 0.0)
+            delta = added - removed
+
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                j += i + 1
+                route[i:j + 1] = route[i:j + 1][::-1]
+                improved = True
+        if not improved:
+            break
+
+    return route
+
+
+def or_opt(route: np.ndarray, dist: np.ndarray, max_segment: int = 3, max_passes: int = 50) -> np.ndarray:
+    """Improve an open path by relocating short segments; the first stop stays fixed"""
+    route = route.copy()
+    n = len(route)
+    if n < 4:
+        return route
+
+    for _ in range(max_passes):
+        improved = False
+        for length in range(1, max_segment + 1):
+            i = 1
+            while i + length <= n:
+                segment = route[i:i + length]
+                rest = np.concatenate([route[:i], route[i + length:]])
+
+                # Cost saved by cutting the segment out
+                prev_stop = route[i - 1]
+                next_stop = route[i + length] if i + length < n else -1
+                saved = dist[prev_stop, segment[0]]
+                if next_stop >= 0:
+                    saved += dist[segment[-1], next_stop] - dist[prev_stop, next_stop]
+
+                # Cost of inserting it (forward or reversed) after each stop of the rest
+                left = rest
+                right = np.append(rest[1:], -1)
+                has_right = right >= 0
+                base = np.where(has_right, dist[left, np.maximum(right, 0)], 0.0)
+                forward = dist[left, segment[0]] + np.where(has_right, dist[segment[-1], np.maximum(right, 0)], 0.0) - base
+                backward = dist[left, segment[-1]] + np.where(has_right, dist[segment[0], np.maximum(right, 0)], 0.0) - base
+
+                costs = np.minimum(forward, backward)
+                costs[i - 1] = np.inf  # Original position
+                k = int(np.argmin(costs))
+
+                if costs[k] < saved - 1e-9:
+                    piece = segment if forward[k] <= backward[k] else segment[::-1]
+                    route = np.concatenate([rest[:k + 1], piece, rest[k + 1:]])
+                    improved = True
+                else:
+                    i += 1
+        if not improved:
+            break
+
+    return route
+
+
+def optimize_route(coords: np.ndarray) -> Tuple[List[int], float, float]:
+    """Propose a stop order for one route-day.
+
+    Returns the new order (indices into coords), the current length and the
+    proposed length in km. The first stop is kept as the route's anchor.
+    """
+    coords = np.asarray(coords, dtype=float)
+    n = len(coords)
+    if n < 3:
+        return list(range(n)), 0.0, 0.0
+
+    dist = distance_matrix(coords)
+    current_length = route_length(np.arange(n), dist)
+
+    route = nearest_neighbor(dist, start=0)
+    route = two_opt(route, dist)
+    route = or_opt(route, dist)
+    route = two_opt(route, dist)
+
+    proposed_length = route_length(route, dist)
+    if proposed_length >= current_length:
+        return list(range(n)), current_length, current_length
+
+    return [int(i) for i in route], current_length, proposed_length
+
+
+def _optimize_group(item):
+    key, coords = item
+    return key, optimize_route(coords)
+
+
+def optimize_route_days(
+    groups: Dict[tuple, np.ndarray],
+    max_workers: Optional[int] = None
+) -> Dict[tuple, Tuple[List[int], float, float]]:
+    """Optimize many route-days, in parallel on a process pool when worthwhile"""
+    if not groups:
+        return {}
+
+    max_workers = max_workers or min(len(groups), os.cpu_count() or 1)
+    if max_workers <= 1:
+        return dict(map(_optimize_group, groups.items()))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(_optimize_group, groups.items()))
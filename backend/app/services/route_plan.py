@@ -0,0 +1,71 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Union
+from app.models.customer import Customer
+from app.models.visit import Visit
+from app.models.tombstone import Tombstone
+from app.services.events import event_broker
+from app.services.geocode import fill_coordinates
+from app.services.partitioning import ensure_territory_partition
+from app.services.cycles import move_visits_to_archive
+from app.services.route_table import RoutePlanTable
+from app.services.sync_governor import lock_route_plan
+
+
+class CustomerBatchWriter:
+    """Buffers parsed customer rows and inserts them with executemany batches"""
+    
+    def __init__(self, db: Session, territory: str, batch_size: int = 1000):
+        self.db = db
+        self.territory = territory
+        self.batch_size = batch_size
+        self.count = 0
+        self._buffer: List[Dict] = []
+    
+    def add_many(self, customers_data: Union[RoutePlanTable, Iterable[Dict]]):
+        if isinstance(customers_data, RoutePlanTable):
+            # Insert parameters are built from the columns one batch at a time
+            rows = customers_data.records(territory=self.territory)
+        else:
+            rows = ({**customer_data, "territory": self.territory} for customer_data in customers_data)
+        
+        for row in rows:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+    
+    def flush(self):
+        if not self._buffer:
+            return
+        fill_coordinates(self._buffer)
+        self.db.execute(insert(Customer), self._buffer)
+        self.count += len(self._buffer)
+        self._buffer = []
+
+
+def clear_route_plan(db: Session, territory: str):
+    """Delete one territory's customers and archive its visits (uncommitted)"""
+    lock_route_plan(db, territory)
+    move_visits_to_archive(db, Visit.territory == territory)
+    db.query(Customer).filter(Customer.territory == territory).delete(synchronize_session=False)
+    
+    # A single reset marker replaces any per-row tombstones for change feed clients
+    db.query(Tombstone).filter(Tombstone.territory == territory).delete(synchronize_session=False)
+    db.add(Tombstone(territory=territory, entity_type="all"))
+    
+    ensure_territory_partition(db, territory)
+
+
+def replace_route_plan(db: Session, territory: str, customers_data: Union[RoutePlanTable, Iterable[Dict]]) -> int:
+    """Replace a territory's customers and visits with a freshly parsed route plan"""
+    clear_route_plan(db, territory)
+    
+    writer = CustomerBatchWriter(db, territory)
+    writer.add_many(customers_data)
+    writer.flush()
+    
+    db.commit()
+    
+    event_broker.publish("route_plan.imported", {"customers": writer.count}, territory)
+    
+    return writer.count
@@ -0,0 +1,151 @@
+import math
+from array import array
+from datetime import date
+from typing import Dict, Iterator, Optional
+
+# Column order of RoutePlanTable.row_values()
+COLUMNS = (
+    "name", "address", "account_number", "latitude", "longitude",
+    "week_number", "week_label", "day_of_week", "date", "location", "stop_number",
+)
+
+
+class StringDictionary:
+    """Dictionary encoding for a low-cardinality column (labels, days, towns, dates)"""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def encode(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __getstate__(self):
+        return self.values
+
+    def __setstate__(self, values):
+        self.values = values
+        self._codes = {value: code for code, value in enumerate(values)}
+
+
+class RoutePlanTable:
+    """Column-oriented parsed route plan.
+
+    Per-customer strings (name, address, account number) are kept once in
+    lists; coordinates and numbers live in typed arrays (NaN for missing
+    coordinates); the heavily repeated week label, day, date and location
+    are dictionary-encoded. Iterating yields one dict per row for code that
+    wants the old list-of-dicts shape, but bulk writers and the exporter read
+    the columns directly.
+    """
+
+    __slots__ = (
+        "names", "addresses", "account_numbers", "latitudes", "longitudes",
+        "week_numbers", "stop_numbers", "week_label_codes", "day_codes", "date_codes", "location_codes",
+        "week_labels", "days", "dates", "locations",
+    )
+
+    def __init__(self):
+        self.names = []
+        self.addresses = []
+        self.account_numbers = []
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self.week_numbers = array("b")
+        self.stop_numbers = array("h")
+        self.week_label_codes = array("H")
+        self.day_codes = array("H")
+        self.date_codes = array("H")
+        self.location_codes = array("H")
+        self.week_labels = StringDictionary()
+        self.days = StringDictionary()
+        self.dates = StringDictionary()
+        self.locations = StringDictionary()
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def append(
+        self,
+        name: str,
+        address: Optional[str],
+        account_number: str,
+        latitude: Optional[float],
+        longitude: Optional[float],
+        week_number: int,
+        week_label: Optional[str],
+        day_of_week: Optional[str],
+        date: Optional[date],
+        location: Optional[str],
+        stop_number: int
+    ):
+        self.names.append(name)
+        self.addresses.append(address)
+        self.account_numbers.append(account_number)
+        self.latitudes.append(math.nan if latitude is None else latitude)
+        self.longitudes.append(math.nan if longitude is None else longitude)
+        self.week_numbers.append(week_number)
+        self.stop_numbers.append(stop_number)
+        self.week_label_codes.append(self.week_labels.encode(week_label))
+        self.day_codes.append(self.days.encode(day_of_week))
+        self.date_codes.append(self.dates.encode(date))
+        self.location_codes.append(self.locations.encode(location))
+
+    def append_row(self, row: Dict):
+        self.append(*(row.get(column) for column in COLUMNS))
+
+    def extend(self, other: "RoutePlanTable"):
+        for i in range(len(other)):
+            self.append(*other.row_values(i))
+
+    @classmethod
+    def from_rows(cls, rows) -> "RoutePlanTable":
+        table = cls()
+        for row in rows:
+            table.append_row(row)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def row_values(self, i: int) -> tuple:
+        """Row i as a tuple in COLUMNS order"""
+        latitude = self.latitudes[i]
+        longitude = self.longitudes[i]
+        return (
+            self.names[i],
+            self.addresses[i],
+            self.account_numbers[i],
+            None if math.isnan(latitude) else latitude,
+            None if math.isnan(longitude) else longitude,
+            self.week_numbers[i],
+            self.week_labels.values[self.week_label_codes[i]],
+            self.days.values[self.day_codes[i]],
+            self.dates.values[self.date_codes[i]],
+            self.locations.values[self.location_codes[i]],
+            self.stop_numbers[i],
+        )
+
+    def row(self, i: int) -> Dict:
+        return dict(zip(COLUMNS, self.row_values(i)))
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def records(self, start: int = 0, stop: Optional[int] = None, **extra) -> Iterator[Dict]:
+        """Rows start..stop as insert parameter dicts, with extra columns (e.g. territory)"""
+        for i in range(start, len(self) if stop is None else min(stop, len(self))):
+            record = dict(zip(COLUMNS, self.row_values(i)))
+            record.update(extra)
+            yield record
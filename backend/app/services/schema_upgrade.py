@@ -0,0 +1,103 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.database import Base
+from app.models.customer import Customer
+from app.models.visit import Visit
+from app.services.latest_visits import LATEST_VISIT_COLUMNS
+# Imported for their tables: the upgrade creates any that are missing
+from app.models import sales_rollup, tombstone, visit_archive  # noqa: F401
+
+# Columns added to tables that predate them:
+# (table, column, DDL type, backfill value, NOT NULL once backfilled).
+# A backfill of None leaves existing rows NULL.
+ADDED_COLUMNS = [
+    ("customers", "created_at", "TIMESTAMP", "now", False),
+    ("customers", "updated_at", "TIMESTAMP", "now", False),
+    ("customers", "latitude", "FLOAT", None, False),
+    ("customers", "longitude", "FLOAT", None, False),
+    ("customers", "territory", "VARCHAR", settings.DEFAULT_TERRITORY, True),
+    ("visits", "territory", "VARCHAR", settings.DEFAULT_TERRITORY, True),
+    # Rows archived before these existed fall back to the current route plan
+    ("visits_archive", "location", "VARCHAR", None, False),
+    ("visits_archive", "week_number", "INTEGER", None, False),
+    ("visits_archive", "day_of_week", "VARCHAR", None, False),
+] + [
+    # Backfilled by repair_latest_visits.py
+    ("customers", column, ddl_type, None, False) for column, ddl_type in LATEST_VISIT_COLUMNS.items()
+]
+
+# Indexes the current models no longer define
+DROPPED_INDEXES = [
+    ("customers", "ix_customers_account_number"),  # Globally unique; now unique per territory
+]
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """Bring a database created by an older version up to the current models, in place.
+
+    create_all only creates missing tables, and deployments that never run it
+    miss new tables too. This creates missing tables, adds and backfills
+    missing columns, and creates (or redefines) secondary indexes. Safe to run
+    repeatedly; returns a description of each change made.
+    """
+    changes = []
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        existing_tables = set(inspect(conn).get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                table.create(conn)
+                changes.append(f"created table {table.name}")
+
+        columns = {
+            table: {column["name"] for column in inspect(conn).get_columns(table)}
+            for table in {table for table, _, _, _, _ in ADDED_COLUMNS}
+        }
+        for table, column, ddl_type, backfill, not_null in ADDED_COLUMNS:
+            if column in columns[table]:
+                continue
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+            if backfill is not None:
+                value = now if backfill == "now" else backfill
+                conn.execute(text(f"UPDATE {table} SET {column} = :value"), {"value": value})
+            # SQLite cannot add NOT NULL to an existing column; the models still require a value
+            if not_null and conn.dialect.name == "postgresql":
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+            changes.append(f"added {table}.{column}")
+
+        for table, name in DROPPED_INDEXES:
+            if name in {index["name"] for index in inspect(conn).get_indexes(table)}:
+                conn.execute(text(f"DROP INDEX {name}"))
+                changes.append(f"dropped index {name}")
+        if conn.dialect.name == "postgresql":
+            # Tables created outside SQLAlchemy may carry a unique constraint instead
+            for (constraint,) in conn.execute(text(
+                "SELECT conname FROM pg_constraint WHERE conrelid = 'customers'::regclass "
+                "AND contype = 'u' AND conkey = ARRAY[(SELECT attnum FROM pg_attribute "
+                "WHERE attrelid = 'customers'::regclass AND attname = 'account_number')]::smallint[]"
+            )).all():
+                conn.execute(text(f"ALTER TABLE customers DROP CONSTRAINT {constraint}"))
+                changes.append(f"dropped constraint {constraint}")
+
+        indexes = {
+            table: {index["name"]: index for index in inspect(conn).get_indexes(table)}
+            for table in ("customers", "visits")
+        }
+        for table in (Customer.__table__, Visit.__table__):
+            for index in table.indexes:
+                existing = indexes[table.name].get(index.name)
+                if existing is not None and (
+                    existing["column_names"] == [column.name for column in index.columns]
+                    and bool(existing["unique"]) == index.unique
+                ):
+                    continue
+                if existing is not None:
+                    # Defined differently by an older version
+                    index.drop(conn)
+                index.create(conn)
+                changes.append(f"{'recreated' if existing is not None else 'created'} index {index.name}")
+
+    return changes
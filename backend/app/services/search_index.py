@@ -0,0 +1,156 @@
+import heapq
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Iterable, List, Tuple
+from sqlalchemy import func, case, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models.customer import Customer, SEARCH_EXTENSION_STATEMENT, SEARCH_INDEX_STATEMENTS
+
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    return NON_ALPHANUMERIC.sub(" ", (text or "").lower()).strip()
+
+
+def trigrams(text: str) -> set:
+    """Trigrams of each word, padded like pg_trgm so prefixes score higher"""
+    grams = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class CustomerSearchIndex:
+    """In-process trigram index over customer name, address and account number.
+
+    Used when the database has no pg_trgm support (e.g. SQLite). The index is
+    rebuilt whenever the customers table fingerprint changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._postings = defaultdict(list)  # trigram -> [doc ids]
+        self._documents = {}  # doc id -> (name, address, account_number)
+
+    def is_current(self, fingerprint) -> bool:
+        return self._fingerprint == fingerprint
+
+    def build(self, rows: Iterable[Tuple[int, str, str, str]], fingerprint):
+        postings = defaultdict(list)
+        documents = {}
+        for customer_id, name, address, account_number in rows:
+            fields = (normalize(name), normalize(address), normalize(account_number))
+            documents[customer_id] = fields
+            for gram in trigrams(" ".join(fields)):
+                postings[gram].append(customer_id)
+
+        with self._lock:
+            self._postings = postings
+            self._documents = documents
+            self._fingerprint = fingerprint
+
+    def search(self, query: str, limit: int = 20, threshold: float = 0.3) -> List[Tuple[int, float]]:
+        """Return (customer_id, score) pairs, best match first"""
+        query_norm = normalize(query)
+        query_grams = trigrams(query_norm)
+        if not query_grams:
+            return []
+
+        with self._lock:
+            postings = self._postings
+            documents = self._documents
+
+        # Share of the query's trigrams found in each document tolerates typos
+        matches = Counter()
+        for gram in query_grams:
+            matches.update(postings.get(gram, ()))
+
+        scored = []
+        for customer_id, common in matches.items():
+            score = common / len(query_grams)
+            if score < threshold:
+                continue
+
+            name, address, account_number = documents[customer_id]
+            if account_number == query_norm:
+                score += 1.0
+            elif name.startswith(query_norm) or account_number.startswith(query_norm):
+                score += 0.5
+            elif query_norm in name or query_norm in address:
+                score += 0.25
+            scored.append((customer_id, round(score, 4)))
+
+        return heapq.nlargest(limit, scored, key=lambda item: item[1])
+
+
+# One index per territory
+_search_indexes = {}
+_search_indexes_lock = threading.Lock()
+
+
+def get_search_index(territory: str) -> CustomerSearchIndex:
+    with _search_indexes_lock:
+        if territory not in _search_indexes:
+            _search_indexes[territory] = CustomerSearchIndex()
+        return _search_indexes[territory]
+
+
+def ensure_search_indexes(engine: Engine) -> bool:
+    """Create pg_trgm and the trigram indexes if missing; False unless the database is Postgres"""
+    if engine.dialect.name != "postgresql":
+        return False
+    
+    with engine.begin() as conn:
+        conn.execute(text(SEARCH_EXTENSION_STATEMENT))
+        for statement in SEARCH_INDEX_STATEMENTS:
+            conn.execute(text(statement))
+    return True
+
+
+def search_customers(db: Session, territory: str, query: str, limit: int = 20) -> List[Tuple[Customer, float]]:
+    """Ranked fuzzy customer search: pg_trgm on Postgres, in-process index elsewhere"""
+    if db.bind.dialect.name == "postgresql":
+        pattern = f"%{query}%"
+        score = func.greatest(
+            func.word_similarity(query, Customer.name),
+            func.word_similarity(query, func.coalesce(Customer.address, "")),
+            func.similarity(Customer.account_number, query),
+        ) + case(
+            (Customer.account_number == query, 1.0),
+            (Customer.name.ilike(f"{query}%"), 0.5),
+            (or_(Customer.name.ilike(pattern), Customer.address.ilike(pattern)), 0.25),
+            else_=0.0,
+        )
+        rows = db.query(Customer, score.label("score")).filter(
+            Customer.territory == territory,
+            or_(
+                Customer.name.op("%>")(query),
+                Customer.address.op("%>")(query),
+                Customer.account_number.ilike(f"{query}%"),
+                Customer.name.ilike(pattern),
+                Customer.address.ilike(pattern),
+            )
+        ).order_by(score.desc()).limit(limit).all()
+        return [(customer, round(float(s), 4)) for customer, s in rows]
+
+    index = get_search_index(territory)
+    fingerprint = db.query(func.count(Customer.id), func.max(Customer.updated_at)).filter(
+        Customer.territory == territory
+    ).one()
+    if not index.is_current(tuple(fingerprint)):
+        rows = db.query(Customer.id, Customer.name, Customer.address, Customer.account_number).filter(
+            Customer.territory == territory
+        ).all()
+        index.build(rows, tuple(fingerprint))
+
+    hits = index.search(query, limit=limit)
+    if not hits:
+        return []
+
+    customers = {c.id: c for c in db.query(Customer).filter(Customer.id.in_([cid for cid, _ in hits])).all()}
+    return [(customers[cid], score) for cid, score in hits if cid in customers]
@@ -0,0 +1,223 @@
+import gzip
+import io
+from datetime import date, datetime
+from typing import BinaryIO, Dict, List, Optional, Set
+import msgpack
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session
+from app.models.customer import Customer
+from app.models.tombstone import Tombstone
+from app.models.visit import Visit
+from app.models.visit_archive import VisitArchive
+from app.services.analytics import rebuild_sales_rollups
+
+SNAPSHOT_FORMAT = "sales-route-tracker-snapshot"
+SNAPSHOT_VERSION = 1
+
+# Dump order; restore deletes in reverse so visits go before their customers
+SNAPSHOT_TABLES = [Customer.__table__, Visit.__table__, VisitArchive.__table__]
+BATCH_ROWS = 5000
+
+# msgpack extension types for values it has no native form for
+EXT_DATE = 1
+EXT_DATETIME = 2
+
+# Characters escaped in COPY text format
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def encode_value(value):
+    if isinstance(value, datetime):
+        return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(EXT_DATE, value.isoformat().encode())
+    raise TypeError(f"Cannot snapshot value of type {type(value).__name__}")
+
+
+def decode_ext(code: int, data: bytes):
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == EXT_DATE:
+        return date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def write_snapshot(db: Session, out: BinaryIO, territory: Optional[str] = None) -> Dict[str, int]:
+    """Stream customers, visits and archived visits into a gzip-compressed msgpack snapshot.
+
+    The stream is a header, then per table a {"table", "columns"} record,
+    batches of row lists read through a server-side cursor, and an
+    {"end", "rows"} record; a final {"complete": True} marks a whole file.
+    Statuses are written by name, so snapshots survive code changes.
+    Returns the rows written per table.
+    """
+    packer = msgpack.Packer(default=encode_value)
+    counts = {}
+    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as stream:
+        stream.write(packer.pack({
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "created_at": datetime.utcnow(),
+            "territory": territory,
+        }))
+
+        for table in SNAPSHOT_TABLES:
+            columns = [column.name for column in table.columns]
+            stream.write(packer.pack({"table": table.name, "columns": columns}))
+
+            query = select(table).order_by(table.c.id)
+            if territory is not None:
+                query = query.where(table.c.territory == territory)
+            result = db.execute(query.execution_options(yield_per=BATCH_ROWS))
+
+            count = 0
+            for batch in result.partitions():
+                stream.write(packer.pack([list(row) for row in batch]))
+                count += len(batch)
+            stream.write(packer.pack({"end": table.name, "rows": count}))
+            counts[table.name] = count
+
+        stream.write(packer.pack({"complete": True}))
+    return counts
+
+
+def reset_id_sequences(db: Session):
+    """Move Postgres id sequences past the restored ids"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in (Customer.__table__, Visit.__table__):
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT max(id) FROM {table.name}), 0) + 1, false)"
+        ))
+
+
+def insert_rows(db: Session, table, columns: List[str], rows: List[list]):
+    db.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+
+def copy_field(value) -> str:
+    """One field in COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(COPY_ESCAPES)
+    return str(value)
+
+
+def copy_rows(db: Session, table, columns: List[str], rows: List[list]):
+    """Postgres: load a batch with COPY, several times faster than multi-row INSERT"""
+    dialect = db.get_bind().dialect
+    processors = [table.c[name].type.bind_processor(dialect) for name in columns]
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(
+            copy_field(value if process is None or value is None else process(value))
+            for process, value in zip(processors, row)
+        ))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+
+def clear_tables(db: Session, territory: Optional[str]):
+    if territory is None and db.get_bind().dialect.name == "postgresql":
+        # No dead rows left behind for the reload's foreign key checks to wade through
+        db.execute(text(f"TRUNCATE {', '.join(table.name for table in reversed(SNAPSHOT_TABLES))}"))
+        return
+    for table in reversed(SNAPSHOT_TABLES):
+        query = delete(table)
+        if territory is not None:
+            query = query.where(table.c.territory == territory)
+        db.execute(query)
+
+
+def existing_territories(db: Session) -> Set[str]:
+    return {
+        territory
+        for table in SNAPSHOT_TABLES
+        for (territory,) in db.execute(select(table.c.territory).distinct())
+    }
+
+
+def mark_territories_reset(db: Session, territories: Set[str]):
+    """Tell change feed clients to drop everything they hold for these territories"""
+    territories = sorted(territory for territory in territories if territory is not None)
+    if not territories:
+        return
+    db.execute(delete(Tombstone).where(Tombstone.territory.in_(territories)))
+    db.execute(insert(Tombstone), [{"territory": territory, "entity_type": "all"} for territory in territories])
+
+
+def restore_snapshot(db: Session, source: BinaryIO) -> Dict[str, int]:
+    """Replace the snapshot's data (one territory, or everything) with its contents (uncommitted).
+
+    Batches load with COPY on Postgres and executemany elsewhere. Rows keep
+    their ids, so a single-territory restore fails if another territory has
+    since taken them. Columns missing from an older snapshot
+    get their defaults; columns the tree no longer has are ignored. The
+    sales rollup is rebuilt afterwards, and every territory cleared or
+    restored gets a reset marker in place of its tombstones, as a route plan
+    import does. Returns the rows restored per table.
+    """
+    tables = {table.name: table for table in SNAPSHOT_TABLES}
+    unpacker = msgpack.Unpacker(
+        gzip.GzipFile(fileobj=source, mode="rb"),
+        ext_hook=decode_ext,
+        max_buffer_size=0,
+        strict_map_key=False
+    )
+
+    header = next(unpacker, None)
+    if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError("Not a route tracker snapshot")
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {header.get('version')}")
+    territory = header["territory"]
+    # Clients of territories emptied by a full restore must drop their rows too
+    reset = {territory} if territory is not None else existing_territories(db)
+    clear_tables(db, territory)
+    load = copy_rows if db.get_bind().dialect.name == "postgresql" else insert_rows
+
+    counts = {}
+    table = keep = territory_column = None
+    complete = False
+    for record in unpacker:
+        if isinstance(record, list):
+            if table is None:
+                raise SnapshotError("Rows outside a table section")
+            if record:
+                load(db, table, [name for _, name in keep], [[row[i] for i, _ in keep] for row in record])
+                if territory is None and territory_column is not None:
+                    reset.update(row[territory_column] for row in record)
+            counts[table.name] += len(record)
+        elif "table" in record:
+            if record["table"] not in tables:
+                raise SnapshotError(f"Unknown table {record['table']}")
+            table = tables[record["table"]]
+            keep = [(i, name) for i, name in enumerate(record["columns"]) if name in table.c]
+            territory_column = next((i for i, name in keep if name == "territory"), None)
+            counts[table.name] = 0
+        elif "end" in record:
+            if table is None or record["rows"] != counts[table.name]:
+                raise SnapshotError(f"Truncated section for {record['end']}")
+            table = None
+        elif record.get("complete"):
+            complete = True
+            break
+    if not complete:
+        raise SnapshotError("Snapshot is incomplete")
+
+    reset_id_sequences(db)
+    mark_territories_reset(db, reset)
+    rebuild_sales_rollups(db, territory)
+    return counts
+
@@ -0,0 +1,119 @@
+from typing import Dict, Optional
+from sqlalchemy import Integer, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from app.models.sales_rollup import SalesRollup
+from app.models.visit import Visit
+from app.models.visit_archive import VisitArchive
+from app.models.visit_status import STATUS_CODES, VisitStatus, seed_visit_statuses, status_check
+from app.services.analytics import rebuild_sales_rollups
+
+
+def status_is_coded(conn: Connection, table: str) -> bool:
+    columns = {column["name"]: column["type"] for column in inspect(conn).get_columns(table)}
+    return isinstance(columns["status"], Integer)
+
+
+def unknown_statuses(conn: Connection, table: str) -> list:
+    names = ", ".join(f"'{name}'" for name in STATUS_CODES)
+    return [row[0] for row in conn.execute(text(
+        f"SELECT DISTINCT status FROM {table} WHERE status IS NOT NULL AND status NOT IN ({names})"
+    ))]
+
+
+def status_case(null_code: Optional[int], unknown_code: Optional[int]) -> str:
+    """SQL mapping a text status column to its code"""
+    null = "NULL" if null_code is None else str(null_code)
+    unknown = "NULL" if unknown_code is None else str(unknown_code)
+    branches = " ".join(f"WHEN '{name}' THEN {code}" for name, code in STATUS_CODES.items())
+    return f"CASE WHEN status IS NULL THEN {null} ELSE CASE status {branches} ELSE {unknown} END END"
+
+
+def rebuild_sqlite_table(conn: Connection, table, case_sql: str):
+    """SQLite cannot change a column type: copy the rows into a freshly created table"""
+    name = table.name
+    conn.execute(text(f"ALTER TABLE {name} RENAME TO {name}_text_status"))
+    for (index,) in conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"
+    ), {"table": f"{name}_text_status"}).all():
+        conn.execute(text(f"DROP INDEX {index}"))
+    table.create(conn)
+    
+    old_columns = {column["name"] for column in inspect(conn).get_columns(f"{name}_text_status")}
+    columns = [column.name for column in table.columns if column.name in old_columns]
+    select_list = ", ".join(f"({case_sql}) AS status" if column == "status" else column for column in columns)
+    conn.execute(text(
+        f"INSERT INTO {name} ({', '.join(columns)}) SELECT {select_list} FROM {name}_text_status"
+    ))
+    conn.execute(text(f"DROP TABLE {name}_text_status"))
+
+
+def migrate_visit_status(engine: Engine, unknown_as: Optional[str] = None) -> Dict[str, int]:
+    """Convert text visit statuses to small-int codes in place.
+    
+    Creates the visit_statuses lookup table, converts visits and
+    visits_archive (NULL becomes not_visited in both), adds the CHECK
+    constraint and status index, and rebuilds the sales rollup. Statuses
+    outside VISIT_STATUSES abort the migration unless unknown_as names the
+    status to store instead. Returns the rows converted per table and the
+    rollup rows written; already-converted tables are skipped, the rollup is
+    rebuilt on every run.
+    """
+    if unknown_as is not None and unknown_as not in STATUS_CODES:
+        raise ValueError(f"Invalid visit status: {unknown_as!r}")
+    unknown_code = None if unknown_as is None else STATUS_CODES[unknown_as]
+    
+    converted = {}
+    with engine.begin() as conn:
+        VisitStatus.__table__.create(conn, checkfirst=True)
+        seed_visit_statuses(conn)
+        
+        tables = [(table, null_code) for table, null_code in (
+            (Visit.__table__, STATUS_CODES["not_visited"]),
+            (VisitArchive.__table__, STATUS_CODES["not_visited"]),
+        ) if not status_is_coded(conn, table.name)]
+        
+        for table, _ in tables:
+            unknown = unknown_statuses(conn, table.name)
+            if unknown and unknown_code is None:
+                raise ValueError(
+                    f"{table.name} has unknown statuses {unknown}; rerun with unknown_as set to map them"
+                )
+        
+        for table, null_code in tables:
+            name = table.name
+            case_sql = status_case(null_code, unknown_code)
+            converted[name] = conn.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+            
+            if conn.dialect.name == "sqlite":
+                rebuild_sqlite_table(conn, table, case_sql)
+                continue
+            
+            conn.execute(text(f"ALTER TABLE {name} ALTER COLUMN status DROP DEFAULT"))
+            conn.execute(text(f"ALTER TABLE {name} ALTER COLUMN status TYPE smallint USING ({case_sql})"))
+            if name == "visits":
+                conn.execute(text(f"ALTER TABLE visits ALTER COLUMN status SET DEFAULT {null_code}"))
+                conn.execute(text("ALTER TABLE visits ALTER COLUMN status SET NOT NULL"))
+                conn.execute(text(f"ALTER TABLE visits ADD CONSTRAINT ck_visits_status CHECK ({status_check()})"))
+                for index in Visit.__table__.indexes:
+                    if not index.unique:
+                        index.create(conn, checkfirst=True)
+        
+        # Archives converted by earlier versions kept NULL statuses
+        archive_nulls = conn.execute(
+            VisitArchive.__table__.update()
+            .where(VisitArchive.__table__.c.status.is_(None))
+            .values(status="not_visited")
+        ).rowcount
+        if archive_nulls:
+            converted[VisitArchive.__tablename__] = converted.get(VisitArchive.__tablename__, 0) + archive_nulls
+        
+        # The rollup is derived data: recreate it with the coded column, and
+        # refill it even when it already has one, since it may be empty
+        rollup = SalesRollup.__table__
+        if inspect(conn).has_table(rollup.name) and not status_is_coded(conn, rollup.name):
+            rollup.drop(conn)
+        rollup.create(conn, checkfirst=True)
+        converted[rollup.name] = rebuild_sales_rollups(Session(bind=conn))
+    
+    return converted
@@ -0,0 +1,125 @@
+import hashlib
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import SYNC_WAIT_DURATION, SYNC_WAITING
+from app.services.jobs import job_manager
+
+# Jobs that parse or generate workbooks
+CPU_HEAVY_JOBS = ("upload", "import", "download", "export")
+
+
+def advisory_key(name: str) -> int:
+    """Stable signed 64-bit key for pg_advisory_*lock"""
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+
+
+def lock_route_plan(db: Session, territory: str):
+    """Serialize route plan replacement per territory across all workers (Postgres).
+    
+    Takes a transaction-scoped advisory lock, released by the commit or rollback
+    that ends the import. Other databases rely on SyncGovernor.dataset_lock.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    SYNC_WAITING.labels("dataset_db").inc()
+    start = time.perf_counter()
+    try:
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": advisory_key(f"route_plan:{territory}")})
+    finally:
+        SYNC_WAITING.labels("dataset_db").dec()
+        SYNC_WAIT_DURATION.labels("dataset_db").observe(time.perf_counter() - start)
+
+
+class SyncGovernor:
+    """Admission control and serialization for sync jobs in this process.
+    
+    - admit(): rejects new import/export jobs once too many are pending
+    - cpu_slot(): bounds concurrent parse/generate stages
+    - dataset_lock(): one route plan import per territory at a time
+    """
+
+    def __init__(self, cpu_slots: int = 2, max_pending: int = 8):
+        self.cpu_slots = cpu_slots
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(cpu_slots)
+        self._locks = defaultdict(threading.Lock)  # territory -> lock
+        self._locks_guard = threading.Lock()
+        self._in_use = 0
+        self._waiting = defaultdict(int)
+        self._counts_lock = threading.Lock()
+        self._average_seconds = None  # Moving average of parse/generate stage time
+
+    def admit(self) -> Optional[int]:
+        """None if a new job may be queued, else the seconds to send in Retry-After"""
+        pending = job_manager.pending(CPU_HEAVY_JOBS)
+        if pending < self.max_pending:
+            return None
+        # Time for the jobs ahead to drain through the CPU slots
+        average = self._average_seconds or 5.0
+        return max(1, math.ceil((pending - self.max_pending + 1) * average / self.cpu_slots))
+
+    @contextmanager
+    def _waiting_for(self, resource: str):
+        with self._counts_lock:
+            self._waiting[resource] += 1
+        SYNC_WAITING.labels(resource).inc()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._counts_lock:
+                self._waiting[resource] -= 1
+            SYNC_WAITING.labels(resource).dec()
+            SYNC_WAIT_DURATION.labels(resource).observe(time.perf_counter() - start)
+
+    @contextmanager
+    def cpu_slot(self):
+        """Hold one of the CPU slots while parsing or generating a workbook"""
+        with self._waiting_for("cpu"):
+            self._slots.acquire()
+        with self._counts_lock:
+            self._in_use += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._counts_lock:
+                self._in_use -= 1
+                self._average_seconds = elapsed if self._average_seconds is None else (
+                    0.8 * self._average_seconds + 0.2 * elapsed
+                )
+            self._slots.release()
+
+    @contextmanager
+    def dataset_lock(self, territory: str):
+        """Hold the territory's import lock (in this process; see lock_route_plan)"""
+        with self._locks_guard:
+            lock = self._locks[territory]
+        with self._waiting_for("dataset"):
+            lock.acquire()
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def stats(self) -> dict:
+        return {
+            "cpu_slots": self.cpu_slots,
+            "cpu_slots_in_use": self._in_use,
+            "waiting_for_cpu": self._waiting["cpu"],
+            "waiting_for_dataset": self._waiting["dataset"],
+            "pending_jobs": job_manager.pending(CPU_HEAVY_JOBS),
+            "max_pending_jobs": self.max_pending,
+        }
+
+
+# Global instance
+sync_governor = SyncGovernor(settings.SYNC_CPU_SLOTS, settings.SYNC_MAX_PENDING)
@@ -0,0 +1,63 @@
+"""Benchmark route plan parsing and tracking export on synthetic workbooks.
+
+Usage (from backend/):
+    python benchmarks/bench_parser.py --customers 1000 --repeat 5 --output bench-results/parser.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.excel_parser import parse_excel_route_plan, export_tracking_data  # noqa: E402
+from app.services.route_table import RoutePlanTable  # noqa: E402
+from results import print_table, save_results, summarize, time_calls  # noqa: E402
+from synthetic import synthetic_customers, write_route_plans  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=1000,
+                        help="Customers in total; split into 200-customer workbooks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_route_plans(os.path.join(tmp, "plans"), args.customers, seed=args.seed)
+        print(f"{args.customers} customers in {len(paths)} workbook(s)")
+
+        def parse_all():
+            table = RoutePlanTable()
+            for path in paths:
+                table.extend(parse_excel_route_plan(path))
+            return table
+
+        rows = len(parse_all())
+        samples = time_calls(parse_all, args.repeat, warmup=0)
+        results["parse_excel_route_plan"] = {**summarize(samples), "rows": rows}
+
+        customers = RoutePlanTable.from_rows(synthetic_customers(args.customers, seed=args.seed))
+        latest_visits = [{
+            "status": "sale_made",
+            "visited_at": "2026-01-19T10:00:00",
+            "sales_amount": 125.0,
+            "notes": "Synthetic visit",
+            "follow_up_required": False,
+            "follow_up_date": "",
+        }] * len(customers)
+        output_path = os.path.join(tmp, "tracking.xlsx")
+        samples = time_calls(lambda: export_tracking_data(customers, output_path, latest_visits), args.repeat)
+        results["export_tracking_data"] = {**summarize(samples), "rows": len(customers)}
+
+    print_table(results)
+    if args.output:
+        save_results(args.output, "parser", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
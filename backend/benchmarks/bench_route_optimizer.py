@@ -0,0 +1,52 @@
+"""Benchmark the route optimizer on synthetic territories.
+
+Usage (from backend/):
+    python benchmarks/bench_route_optimizer.py --route-days 20 --stops 300
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.route_optimizer import optimize_route_days  # noqa: E402
+
+
+def synthetic_territory(route_days: int, stops: int, seed: int = 0):
+    """Clustered stops around a few town centers, one cluster mix per route-day"""
+    rng = np.random.default_rng(seed)
+    towns = np.c_[40.7 + rng.random(8) * 0.4, -124.3 + rng.random(8) * 0.4]
+    
+    groups = {}
+    for day in range(route_days):
+        centers = towns[rng.integers(0, len(towns), size=stops)]
+        groups[(day // 5 + 1, f"DAY {day % 5 + 1}")] = centers + rng.normal(0, 0.02, size=(stops, 2))
+    return groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--route-days", type=int, default=20)
+    parser.add_argument("--stops", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    
+    groups = synthetic_territory(args.route_days, args.stops)
+    print(f"{args.route_days} route-days x {args.stops} stops, {args.workers} workers")
+    
+    for label, workers in (("serial", 1), ("parallel", args.workers)):
+        start = time.perf_counter()
+        results = optimize_route_days(groups, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        
+        before = sum(r[1] for r in results.values())
+        after = sum(r[2] for r in results.values())
+        print(f"{label:>8}: {elapsed:7.2f}s  total distance {before:10.1f} km -> {after:10.1f} km "
+              f"({(1 - after / before) * 100:.1f}% shorter)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compare the memory footprint of parsed route plans: list of dicts vs RoutePlanTable.
+
+Strings from the workbook (names, addresses, account numbers, repeated
+labels) are shared by both forms, so the difference is the per-row container
+overhead the columnar table removes.
+
+Usage (from backend/):
+    python benchmarks/bench_route_plan_memory.py --customers 100000 --output bench-results/memory.json
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.excel_parser import parse_excel_route_plan  # noqa: E402
+from app.services.route_table import COLUMNS, RoutePlanTable  # noqa: E402
+from results import save_results  # noqa: E402
+from synthetic import synthetic_customers, write_route_plans  # noqa: E402
+
+
+def allocated(build):
+    """Bytes still allocated by build()'s result, and the result itself"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return current, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=100_000,
+                        help="Rows across all territories (200 per workbook)")
+    parser.add_argument("--parse-customers", type=int, default=2_000,
+                        help="Rows to parse from real workbooks for the end-to-end check")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    # Parsed cell values, shaped like the old parser's per-row dicts
+    rows = synthetic_customers(args.customers, seed=args.seed)
+    values = [tuple(row[column] for column in COLUMNS) for row in rows]
+    del rows
+
+    legacy_bytes, legacy = allocated(lambda: [
+        {**dict(zip(COLUMNS[:5], v[:5])), **dict(zip(COLUMNS[5:], v[5:]))} for v in values
+    ])
+    del legacy
+
+    def build_table():
+        table = RoutePlanTable()
+        for v in values:
+            table.append(*v)
+        return table
+
+    table_bytes, table = allocated(build_table)
+    del table
+
+    results = {
+        "rows": len(values),
+        "list_of_dicts_bytes_per_row": round(legacy_bytes / len(values), 1),
+        "route_plan_table_bytes_per_row": round(table_bytes / len(values), 1),
+        "reduction": round(1 - table_bytes / legacy_bytes, 3),
+    }
+
+    # End to end: parse real multi-territory workbooks into a table vs expanding it to dicts
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_route_plans(tmp, args.parse_customers, seed=args.seed)
+
+        def parse_all():
+            table = RoutePlanTable()
+            for path in paths:
+                table.extend(parse_excel_route_plan(path))
+            return table
+
+        parsed_bytes, parsed = allocated(parse_all)
+        dict_bytes, _ = allocated(lambda: list(parsed))
+        results["parsed_workbooks"] = len(paths)
+        results["parsed_table_bytes_per_row"] = round(parsed_bytes / len(parsed), 1)
+        results["parsed_extra_bytes_per_row_as_dicts"] = round(dict_bytes / len(parsed), 1)
+
+    print(f"{results['rows']} rows")
+    print(f"  list of dicts:  {results['list_of_dicts_bytes_per_row']:8.1f} bytes/row")
+    print(f"  RoutePlanTable: {results['route_plan_table_bytes_per_row']:8.1f} bytes/row "
+          f"({results['reduction'] * 100:.0f}% smaller)")
+    print(f"{len(parsed)} rows parsed from {len(paths)} workbooks: "
+          f"{results['parsed_table_bytes_per_row']:.1f} bytes/row as a table, "
+          f"+{results['parsed_extra_bytes_per_row_as_dicts']:.1f} bytes/row if expanded to dicts")
+
+    if args.output:
+        save_results(args.output, "route_plan_memory", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Measure cold start: import time of app.main and time to first response.
+
+Each run is a fresh interpreter, like a scale-to-zero instance waking up.
+
+Usage (from backend/, with the usual .env):
+    python benchmarks/bench_startup.py --repeat 5 --output bench-results/startup.json
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from results import print_table, save_results, summarize  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(top: int):
+    """Total import time of app.main and its slowest top-level dependencies (python -X importtime)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+
+    # Lines look like "import time: self [us] | cumulative | <indent>package", children
+    # before their parent; two-space entries right before app.main are its direct imports
+    children, total = {}, 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        seconds = int(cumulative) / 1e6
+        indent = len(name) - len(name.lstrip()) - 1
+        if indent == 0:
+            if name.strip() == "app.main":
+                total = seconds
+                break
+            children = {}
+        elif indent == 2:
+            children[name.strip()] = seconds
+
+    slowest = sorted(children.items(), key=lambda item: item[1], reverse=True)[:top]
+    return total, slowest
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def first_response_time(path: str, timeout: float = 60.0) -> float:
+    """Seconds from launching uvicorn until path answers 200"""
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}{path}", timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            time.sleep(0.01)
+        raise TimeoutError(f"No response from {path} within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--path", default="/health", help="Endpoint polled for the first response")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to report")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    import_samples = []
+    slowest = []
+    for _ in range(args.repeat):
+        total, slowest = import_time(args.top)
+        import_samples.append(total)
+
+    response_samples = [first_response_time(args.path) for _ in range(args.repeat)]
+
+    results = {
+        "import app.main": summarize(import_samples),
+        f"first response {args.path}": summarize(response_samples),
+    }
+    print_table(results)
+    print("\nSlowest imports (last run):")
+    for name, seconds in slowest:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    results["slowest_imports_ms"] = {name: round(seconds * 1000, 1) for name, seconds in slowest}
+    if args.output:
+        save_results(args.output, "startup", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
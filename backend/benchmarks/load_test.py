@@ -0,0 +1,90 @@
+"""Load test a running backend and report latency percentiles and throughput.
+
+Usage (from backend/, against e.g. `uvicorn app.main:app --workers 4`):
+    python benchmarks/load_test.py --url http://localhost:8000 --concurrency 20 --duration 30 \\
+        --path /customers/ --path /visits/stats/dashboard --output bench-results/load.json
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from results import print_table, save_results, summarize  # noqa: E402
+
+DEFAULT_PATHS = ["/customers/", "/visits/", "/visits/stats/dashboard", "/changes/", "/health"]
+
+
+async def worker(client: httpx.AsyncClient, paths, deadline: float, offset: int, samples, errors):
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - start
+        if ok:
+            samples[path].append(elapsed)
+        else:
+            errors[path] += 1
+
+
+async def run(args):
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    headers = {"X-Territory": args.territory} if args.territory else {}
+    if args.token:
+        headers["Authorization"] = f"Bearer {args.token}"
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*[
+            worker(client, args.paths, deadline, n, samples, errors) for n in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+
+    results = {path: {**summarize(samples[path], elapsed), "errors": errors[path]}
+               for path in args.paths if samples[path]}
+    all_samples = [s for path_samples in samples.values() for s in path_samples]
+    if all_samples:
+        results["total"] = {**summarize(all_samples, elapsed), "errors": sum(errors.values())}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", dest="paths", action="append", help="Endpoint to request (repeatable)")
+    parser.add_argument("--territory", help="Sent as the X-Territory header")
+    parser.add_argument("--token", help="Access token granting the territory (sent as a Bearer token)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    args.paths = args.paths or DEFAULT_PATHS
+
+    results = asyncio.run(run(args))
+    if not results:
+        print("No successful requests")
+        sys.exit(1)
+
+    print_table(results)
+    total = results["total"]
+    print(f"{total['throughput_rps']} requests/s, {total['errors']} errors")
+    if args.output:
+        save_results(args.output, "load", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
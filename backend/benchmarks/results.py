@@ -0,0 +1,81 @@
+"""Timing statistics and JSON result files shared by the benchmark scripts."""
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of the samples"""
+    ordered = sorted(samples)
+    rank = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: List[float], elapsed: Optional[float] = None) -> Dict:
+    """Latency summary in milliseconds; throughput when the wall time is known"""
+    ms = [s * 1000 for s in samples]
+    summary = {
+        "runs": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "min_ms": round(min(ms), 3),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3),
+    }
+    if elapsed:
+        summary["throughput_rps"] = round(len(ms) / elapsed, 2)
+    return summary
+
+
+def time_calls(fn: Callable, repeat: int, warmup: int = 1) -> List[float]:
+    """Run fn warmup + repeat times; returns the timed durations in seconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(path: str, benchmark: str, parameters: Dict, results: Dict):
+    """Write a run to JSON with enough metadata to compare it against later runs"""
+    payload = {
+        "benchmark": benchmark,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": results,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, default=str)
+    print(f"Results written to {path}")
+
+
+def print_table(results: Dict[str, Dict]):
+    print(f"{'benchmark':<44} {'runs':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for name, summary in results.items():
+        print(f"{name:<44} {summary['runs']:>5} {summary['p50_ms']:>10.2f} "
+              f"{summary['p95_ms']:>10.2f} {summary['p99_ms']:>10.2f}")
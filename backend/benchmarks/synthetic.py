@@ -0,0 +1,170 @@
+"""Synthetic route plans, customers and visits for benchmarks.
+
+Workbooks follow the sample_route_plan.xlsx layout: a '4-Week Route Plan'
+sheet with 4 weeks x 5 days x up to 10 stops, so one workbook holds at most
+200 customers. Larger route plans are split across several workbooks (one
+per territory), the way multi-workbook imports arrive.
+"""
+import os
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import openpyxl
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.customer import Customer
+from app.models.visit import Visit
+from app.services.analytics import rebuild_sales_rollups
+from app.services.cycles import active_cycle_start
+from app.services.latest_visits import repair_latest_visits
+from app.services.route_plan import replace_route_plan
+
+DAYS = ["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY"]
+WEEK_HEADER_ROWS = [5, 22, 39, 56]
+STOPS_PER_DAY = 10
+WORKBOOK_CAPACITY = len(WEEK_HEADER_ROWS) * len(DAYS) * STOPS_PER_DAY
+
+TOWNS = {
+    "MCKINLEYVILLE": (40.9465, -124.1007),
+    "ARCATA": (40.8665, -124.0828),
+    "EUREKA": (40.8021, -124.1637),
+    "FORTUNA": (40.5982, -124.1573),
+    "RIO DELL": (40.4990, -124.1065),
+    "GARBERVILLE": (40.1000, -123.7945),
+}
+BUSINESSES = ["AUTO REPAIR", "TOWING", "CONSTRUCTION", "TIRE", "BODY SHOP", "ELECTRIC", "LANDSCAPE", "SUPPLY"]
+STREETS = ["CENTRAL AVE", "BROADWAY", "MYRTLE AVE", "5TH ST", "H ST", "BOYD RD", "HARRIS ST", "W END RD"]
+STATUSES = ["no_contact", "contact_made", "sale_made", "follow_up_required"]
+
+
+def plan_start(today: Optional[date] = None) -> date:
+    """Monday of the current week, so the synthetic cycle is the active one"""
+    today = today or datetime.utcnow().date()
+    return today - timedelta(days=today.weekday())
+
+
+def synthetic_customers(count: int, seed: int = 0, prefix: str = "B", start: Optional[date] = None) -> List[Dict]:
+    """Customer dicts shaped like parse_excel_route_plan output"""
+    rng = random.Random(seed)
+    start = start or plan_start()
+    towns = list(TOWNS)
+    slots_per_cycle = len(WEEK_HEADER_ROWS) * len(DAYS)
+    stops_per_day = max(1, -(-count // slots_per_cycle))  # ceil
+
+    customers = []
+    for i in range(count):
+        slot, stop = divmod(i, stops_per_day)
+        week, day = divmod(slot % slots_per_cycle, len(DAYS))
+        town = towns[(week * len(DAYS) + day) % len(towns)]
+        lat, lng = TOWNS[town]
+        customers.append({
+            "name": f"{rng.choice(towns)} {rng.choice(BUSINESSES)} {i}",
+            "address": f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+            "account_number": f"{prefix}{seed:02d}{i:07d}",
+            "latitude": round(lat + rng.gauss(0, 0.02), 6),
+            "longitude": round(lng + rng.gauss(0, 0.02), 6),
+            "week_number": week + 1,
+            "week_label": f"WEEK {week + 1}",
+            "day_of_week": DAYS[day],
+            "date": start + timedelta(days=week * 7 + day),
+            "location": town,
+            "stop_number": stop + 1,
+        })
+    return customers
+
+
+def write_route_plan(path: str, customers: List[Dict], start: Optional[date] = None):
+    """Write up to WORKBOOK_CAPACITY customers in the route plan workbook layout"""
+    if len(customers) > WORKBOOK_CAPACITY:
+        raise ValueError(f"A route plan workbook holds at most {WORKBOOK_CAPACITY} customers")
+
+    start = start or plan_start()
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "4-Week Route Plan"
+    ws.cell(row=1, column=1, value="Kimball Midwest - 4 Week Sales Route Plan")
+    ws.cell(row=2, column=1, value="Sales Representative: Benchmark | Territory: Synthetic")
+
+    for week, header_row in enumerate(WEEK_HEADER_ROWS):
+        ws.cell(row=header_row - 1, column=1, value=f"WEEK {week + 1}")
+        ws.cell(row=header_row + 1, column=1, value="Location:")
+        ws.cell(row=header_row + 2, column=1, value="Stop #")
+        for day, day_name in enumerate(DAYS):
+            day_date = start + timedelta(days=week * 7 + day)
+            ws.cell(row=header_row, column=day + 2, value=f"{day_name}\n{day_date.strftime('%m/%d/%Y')}")
+            ws.cell(row=header_row + 2, column=day + 2, value="Customer - Account #")
+        for stop in range(1, STOPS_PER_DAY + 1):
+            ws.cell(row=header_row + 2 + stop, column=1, value=stop)
+
+    # Re-slot customers into the fixed grid: 10 stops per day, days fill first
+    for i, customer in enumerate(customers):
+        slot, stop = divmod(i, STOPS_PER_DAY)
+        week, day = divmod(slot, len(DAYS))
+        header_row = WEEK_HEADER_ROWS[week]
+        ws.cell(row=header_row + 1, column=day + 2, value=customer["location"])
+        ws.cell(
+            row=header_row + 3 + stop,
+            column=day + 2,
+            value=(
+                f"{customer['name']}\n{customer['address']}\nAcct: {customer['account_number']}\n"
+                f"{customer['latitude']}, {customer['longitude']}"
+            ),
+        )
+
+    wb.save(path)
+
+
+def write_route_plans(directory: str, count: int, seed: int = 0) -> List[str]:
+    """Write count customers as one or more full workbooks; returns their paths"""
+    os.makedirs(directory, exist_ok=True)
+    customers = synthetic_customers(count, seed=seed)
+    paths = []
+    for n, offset in enumerate(range(0, count, WORKBOOK_CAPACITY)):
+        path = os.path.join(directory, f"territory_{n + 1:03d}.xlsx")
+        write_route_plan(path, customers[offset:offset + WORKBOOK_CAPACITY])
+        paths.append(path)
+    return paths
+
+
+def synthetic_visits(customer_ids: List[int], visits_per_customer: int, territory: str, seed: int = 0,
+                     start: Optional[date] = None) -> List[Dict]:
+    """Visit rows spread between the cycle start and now"""
+    rng = random.Random(seed)
+    start = datetime.combine(start or plan_start(), datetime.min.time())
+    span = max((datetime.utcnow() - start).total_seconds(), 1)
+
+    visits = []
+    for customer_id in customer_ids:
+        for _ in range(visits_per_customer):
+            status = rng.choice(STATUSES)
+            visited_at = start + timedelta(seconds=rng.random() * span)
+            visits.append({
+                "customer_id": customer_id,
+                "territory": territory,
+                "status": status,
+                "visited_at": visited_at,
+                "notes": "Synthetic visit",
+                "sales_amount": round(rng.uniform(50, 2500), 2) if status == "sale_made" else 0.0,
+                "follow_up_required": status == "follow_up_required",
+                "follow_up_date": visited_at + timedelta(days=7) if status == "follow_up_required" else None,
+                "created_at": visited_at,
+                "updated_at": visited_at,
+            })
+    return visits
+
+
+def populate(db: Session, territory: str, customers: int, visits_per_customer: int, seed: int = 0) -> Dict:
+    """Replace a territory's data with synthetic customers and visits"""
+    replace_route_plan(db, territory, synthetic_customers(customers, seed=seed, prefix=territory[:3].upper()))
+    customer_ids = [row[0] for row in db.query(Customer.id).filter(Customer.territory == territory)]
+
+    visits = synthetic_visits(customer_ids, visits_per_customer, territory, seed=seed)
+    for offset in range(0, len(visits), 5000):
+        db.execute(insert(Visit), visits[offset:offset + 5000])
+    rebuild_sales_rollups(db, territory)
+    repair_latest_visits(db, territory, active_cycle_start(db, territory))
+    db.commit()
+
+    return {"customers": len(customer_ids), "visits": len(visits)}
@@ -0,0 +1,23 @@
+"""Test settings: a throwaway SQLite database and placeholder credentials.
+
+Settings are read when app modules are first imported, so they are set here,
+before any test module imports the app.
+"""
+import os
+import secrets
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))  # Synthetic data generator
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ.pop("DATABASE_REPLICA_URL", None)
+os.environ.pop("EVENTS_REDIS_URL", None)
+os.environ.setdefault("MICROSOFT_CLIENT_ID", "test-client")
+os.environ.setdefault("MICROSOFT_CLIENT_SECRET", "test-secret")
+os.environ.setdefault("MICROSOFT_REDIRECT_URI", "http://localhost:8000/auth/callback")
+os.environ.setdefault("ONEDRIVE_FILE_PATH", "/Route_Plan.xlsx")
+os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
@@ -0,0 +1,44 @@
+"""Per-endpoint query budgets, so N+1 regressions fail the build.
+
+Runs every budget from benchmarks/check_query_budgets.py against a synthetic
+territory in a throwaway SQLite database. Use the script directly to check
+the same budgets against Postgres.
+
+Run from backend/:
+    pip install -r requirements-dev.txt
+    python -m pytest
+"""
+import pytest
+
+from check_query_budgets import QUERY_BUDGETS, call
+
+TERRITORY = "budget"
+
+
+@pytest.fixture(scope="module")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.core.database import SessionLocal, init_db
+    from app.core.security import create_access_token
+    from synthetic import populate
+
+    init_db()
+    db = SessionLocal()
+    try:
+        populate(db, TERRITORY, 600, 3, seed=0)
+    finally:
+        db.close()
+
+    token = create_access_token({"sub": "query-budgets", "territories": [TERRITORY]})
+    headers = {"Authorization": f"Bearer {token}", "X-Territory": TERRITORY}
+    with TestClient(app, headers=headers) as client:
+        yield client
+
+
+@pytest.mark.parametrize("name,method,path,kwargs,limit", QUERY_BUDGETS, ids=[b[0] for b in QUERY_BUDGETS])
+def test_query_budget(client, name, method, path, kwargs, limit):
+    from app.core.profiling import assert_max_queries
+
+    with assert_max_queries(limit, name):
+        call(client, method, path, kwargs)
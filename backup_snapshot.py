@@ -0,0 +1,41 @@
+import argparse
+import sys
+import os
+import time
+import traceback
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write customers and full visit history to a compressed binary snapshot"
+    )
+    parser.add_argument("output", help="Snapshot file to write (e.g. backup.snapshot)")
+    parser.add_argument("--territory", default=None, help="Only back up this territory (default: all)")
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal
+    from app.services.snapshot import write_snapshot
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        with open(args.output, "wb") as out:
+            counts = write_snapshot(db, out, args.territory)
+        for table, count in counts.items():
+            print(f"{table}: {count} rows")
+        size = os.path.getsize(args.output)
+        print(f"Wrote {args.output} ({size / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s")
+    except Exception:
+        print("Error writing snapshot:")
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
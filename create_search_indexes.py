@@ -0,0 +1,20 @@
+import sys
+import os
+import traceback
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+load_dotenv()
+
+try:
+    from app.core.database import engine
+    from app.services.search_index import ensure_search_indexes
+    print("Creating customer search indexes...")
+    if ensure_search_indexes(engine):
+        print("Success! pg_trgm and the trigram indexes are in place.")
+    else:
+        print("Not a Postgres database: search uses the in-process index, nothing to create.")
+except Exception:
+    print("Error creating search indexes:")
+    traceback.print_exc()
+    sys.exit(1)
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { visitService } from '../services/api';
+import { visitService, subscribeToEvents } from '../services/api';
 import { TrendingUp, Users, DollarSign, Calendar } from 'lucide-react';
 
 export default function Dashboard() {
@@ -8,6 +8,10 @@ export default function Dashboard() {
 
   useEffect(() => {
     loadStats();
+    return subscribeToEvents(
+      ['visit.created', 'visit.updated', 'visit.deleted', 'route_plan.imported'],
+      () => loadStats()
+    );
   }, []);
 
   const loadStats = async () => {
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { customerService } from '../services/api';
+import { customerService, subscribeToEvents } from '../services/api';
 import CustomerCard from './CustomerCard';
 import { ChevronDown, ChevronUp } from 'lucide-react';
 
@@ -14,6 +14,10 @@ export default function WeekView() {
 
   useEffect(() => {
     loadCustomers();
+    return subscribeToEvents(
+      ['visit.created', 'visit.updated', 'visit.deleted', 'route_plan.imported', 'route_plan.reordered'],
+      () => loadCustomers()
+    );
   }, [selectedWeek]);
 
   const loadCustomers = async () => {
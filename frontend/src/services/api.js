@@ -9,12 +9,16 @@ const api = axios.create({
   },
 });
 
-// Add token to requests
+// Add token and rep territory to requests
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem('token');
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  const territory = localStorage.getItem('territory');
+  if (territory) {
+    config.headers['X-Territory'] = territory;
+  }
   return config;
 });
 
@@ -30,6 +34,7 @@ export const customerService = {
   getById: (id) => api.get(`/customers/${id}`),
   getByAccount: (accountNumber) => api.get(`/customers/account/${accountNumber}`),
   getByWeekAndDay: (week, day) => api.get(`/customers/week/${week}/day/${day}`),
+  search: (q, limit = 20) => api.get('/customers/search', { params: { q, limit } }),
 };
 
 // Visits
@@ -42,6 +47,45 @@ export const visitService = {
   getStats: () => api.get('/visits/stats/dashboard'),
 };
 
+// Changes
+export const changeService = {
+  getSince: (cursor) => api.get('/changes/', { params: cursor ? { since: cursor } : {} }),
+};
+
+// Live updates (Server-Sent Events)
+export const subscribeToEvents = (eventTypes, onEvent) => {
+  // EventSource cannot send headers, so the token and territory go in the query
+  const params = new URLSearchParams();
+  const token = localStorage.getItem('token');
+  if (token) {
+    params.set('access_token', token);
+  }
+  const territory = localStorage.getItem('territory');
+  if (territory) {
+    params.set('territory', territory);
+  }
+  const query = params.toString() ? `?${params}` : '';
+  const source = new EventSource(`${API_URL}/events/${query}`);
+  eventTypes.forEach((type) => {
+    source.addEventListener(type, (event) => onEvent(JSON.parse(event.data)));
+  });
+  return () => source.close();
+};
+
+// Sync jobs run in the background; poll until they finish
+const waitForJob = async (job, intervalMs = 1000) => {
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    job = (await api.get(`/sync/jobs/${job.id}`)).data;
+  }
+  if (job.status !== 'succeeded') {
+    const error = new Error(job.error || `Job ${job.status}`);
+    error.response = { data: { detail: job.error || `Job ${job.status}` } };
+    throw error;
+  }
+  return job;
+};
+
 // Sync
 export const syncService = {
   uploadFile: async (file) => {
@@ -50,13 +94,16 @@ export const syncService = {
     const response = await api.post('/sync/upload', formData, {
       headers: { 'Content-Type': 'multipart/form-data' }
     });
-    return response.data;
+    const job = await waitForJob(response.data);
+    return job.result;
   },
   downloadFile: async () => {
-    const response = await api.get('/sync/download', {
+    const response = await api.get('/sync/download');
+    const job = await waitForJob(response.data);
+    const artifact = await api.get(job.artifact_url, {
       responseType: 'blob'
     });
-    const url = window.URL.createObjectURL(new Blob([response.data]));
+    const url = window.URL.createObjectURL(new Blob([artifact.data]));
     const link = document.createElement('a');
     link.href = url;
     link.setAttribute('download', 'Route_Tracking_Data.xlsx');
@@ -64,8 +111,10 @@ export const syncService = {
     link.click();
     link.remove();
   },
-  syncFromOneDrive: () => api.post('/sync/import'),
-  syncToOneDrive: () => api.post('/sync/export'),
+  syncFromOneDrive: async () => (await waitForJob((await api.post('/sync/import')).data)).result,
+  syncToOneDrive: async () => (await waitForJob((await api.post('/sync/export')).data)).result,
+  getJob: (jobId) => api.get(`/sync/jobs/${jobId}`),
+  cancelJob: (jobId) => api.delete(`/sync/jobs/${jobId}`),
   getStatus: () => api.get('/sync/status')
 };
 
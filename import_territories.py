@@ -0,0 +1,45 @@
+import argparse
+import json
+import sys
+import os
+import time
+import traceback
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a directory or zip of route-plan workbooks (one per rep)")
+    parser.add_argument("source", help="Directory or .zip containing .xlsx route plans")
+    parser.add_argument("--territory", default=None,
+                        help="Import every workbook into this territory (default: one territory per file name)")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per database insert batch")
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal
+    from app.services.bulk_import import import_workbooks
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        report = import_workbooks(
+            db, args.source, territory=args.territory, max_workers=args.workers, batch_size=args.batch_size
+        )
+    except Exception:
+        print("Error importing workbooks:")
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+    report["seconds"] = round(time.perf_counter() - start, 2)
+    print(json.dumps(report, indent=2))
+    if report["errors"]:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,13 @@ sys.path.append(os.path.join(os.getcwd(), 'backend'))
 load_dotenv()
 
 try:
-    from app.core.database import init_db
+    from app.core.database import engine, init_db
+    from app.services.schema_upgrade import upgrade_schema
     print("Connecting to Supabase...")
     init_db()
+    # create_all leaves existing tables alone; add columns and indexes they lack
+    for change in upgrade_schema(engine):
+        print(f"  {change}")
     print("Success! Tables created in Supabase.")
 except Exception:
     print("Error initializing database:")
@@ -0,0 +1,36 @@
+import argparse
+import sys
+import os
+import traceback
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store visit statuses as small-int codes (one-off migration)")
+    parser.add_argument("--unknown-as", default=None,
+                        help="Status to store for rows whose status is not recognized (default: abort)")
+    args = parser.parse_args()
+
+    try:
+        from app.core.database import engine
+        from app.services.status_migration import migrate_visit_status
+        print("Converting visit statuses to codes...")
+        converted = migrate_visit_status(engine, args.unknown_as)
+        rollup_rows = converted.pop("sales_rollups", 0)
+        if converted:
+            for table, rows in converted.items():
+                print(f"{table}: {rows} rows converted")
+        else:
+            print("Visit statuses are already stored as codes.")
+        print(f"sales_rollups: {rollup_rows} rows rebuilt")
+    except Exception:
+        print("Error migrating visit statuses:")
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
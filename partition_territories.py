@@ -0,0 +1,24 @@
+import sys
+import os
+import traceback
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+load_dotenv()
+
+try:
+    from app.core.database import engine
+    from app.services.partitioning import partition_customers_by_territory
+    from app.services.schema_upgrade import upgrade_schema
+    # Partitioning needs the territory column and the per-territory unique index
+    upgrade_schema(engine)
+    print("Partitioning customers by territory...")
+    partitions = partition_customers_by_territory(engine)
+    if partitions:
+        print(f"Success! Created {len(partitions)} territory partitions: {', '.join(partitions)}")
+    else:
+        print("Customers table is already partitioned.")
+except Exception:
+    print("Error partitioning customers:")
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,21 @@
+import sys
+import os
+import traceback
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+load_dotenv()
+
+try:
+    from app.core.database import engine
+    from app.services.partitioning import partition_visits_by_month
+    print("Partitioning visits by month...")
+    partitions = partition_visits_by_month(engine)
+    if partitions:
+        print(f"Success! Created {len(partitions)} monthly partitions: {partitions[0]} .. {partitions[-1]}")
+    else:
+        print("Visits table is already partitioned.")
+except Exception:
+    print("Error partitioning visits:")
+    traceback.print_exc()
+    sys.exit(1)
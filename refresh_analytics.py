@@ -0,0 +1,36 @@
+import argparse
+import sys
+import os
+import traceback
+from datetime import date
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the sales analytics rollup from visits (run on a schedule)")
+    parser.add_argument("--territory", default=None, help="Only rebuild this territory (default: all)")
+    parser.add_argument("--since", type=date.fromisoformat, default=None,
+                        help="Only rebuild days from this date (YYYY-MM-DD; default: all)")
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal
+    from app.services.analytics import rebuild_sales_rollups
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_sales_rollups(db, args.territory, args.since)
+        db.commit()
+        print(f"Sales rollup rebuilt: {rows} rows")
+    except Exception:
+        print("Error rebuilding sales rollup:")
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import sys
+import os
+import traceback
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Backfill or repair the customers' denormalized latest-visit columns"
+    )
+    parser.add_argument("--territory", default=None, help="Only repair this territory (default: all)")
+    args = parser.parse_args()
+
+    from app.core.database import engine, SessionLocal
+    from app.models.customer import Customer
+    from app.services.cycles import active_cycle_start
+    from app.services.latest_visits import ensure_latest_visit_columns, repair_latest_visits
+
+    db = SessionLocal()
+    try:
+        added = ensure_latest_visit_columns(engine)
+        if added:
+            print(f"Added columns: {', '.join(added)}")
+
+        territories = [args.territory] if args.territory else [
+            row[0] for row in db.query(Customer.territory).distinct()
+        ]
+        for territory in sorted(territories):
+            count = repair_latest_visits(db, territory, active_cycle_start(db, territory))
+            db.commit()
+            print(f"{territory}: corrected {count} customers")
+    except Exception:
+        print("Error repairing latest visits:")
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
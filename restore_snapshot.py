@@ -0,0 +1,41 @@
+import argparse
+import sys
+import os
+import time
+import traceback
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replace customers and visits with the contents of a snapshot (one transaction)"
+    )
+    parser.add_argument("input", help="Snapshot file written by backup_snapshot.py")
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal
+    from app.services.snapshot import restore_snapshot
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        with open(args.input, "rb") as source:
+            counts = restore_snapshot(db, source)
+        db.commit()
+        for table, count in counts.items():
+            print(f"{table}: {count} rows")
+        print(f"Restored {args.input} in {time.perf_counter() - start:.1f}s")
+    except Exception:
+        db.rollback()
+        print("Error restoring snapshot:")
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import sys
+import os
+import traceback
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+load_dotenv()
+
+try:
+    from app.core.database import engine
+    from app.services.schema_upgrade import upgrade_schema
+    print("Upgrading database schema...")
+    changes = upgrade_schema(engine)
+    for change in changes:
+        print(f"  {change}")
+    print("Success! Schema is up to date." if changes else "Schema is already up to date.")
+except Exception:
+    print("Error upgrading schema:")
+    traceback.print_exc()
+    sys.exit(1)